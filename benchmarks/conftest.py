@@ -0,0 +1,75 @@
+import json
+import os
+
+import pytest
+from comm import DummyComm
+from ipywidgets import Widget
+from ipywidgets.widgets import widget as widget_module
+
+pytest.importorskip("pytest_benchmark")
+
+# IPYVUE_BENCHMARK_SIZES=1000,10000,100000 for the large trees
+SIZES = [
+    int(n) for n in os.environ.get("IPYVUE_BENCHMARK_SIZES", "1000,10000").split(",")
+]
+
+
+def close_widgets():
+    """Closes all widgets but the one that loads jupyter-vue."""
+    from ipyvue.ForceLoad import force_load_instance
+
+    # Widget.widgets is deprecated in ipywidgets 8
+    instances = getattr(widget_module, "_instances", None)
+    if instances is None:
+        instances = Widget.widgets
+    for widget in list(instances.values()):
+        if widget is not force_load_instance:
+            widget.close()
+
+
+def _message_size(data, buffers):
+    size = len(json.dumps(data, default=str))
+    return size + sum(memoryview(b).nbytes for b in buffers or [])
+
+
+@pytest.fixture
+def measure(benchmark, monkeypatch):
+    """Benchmarks a function and records the comm messages (open, update, custom
+    and close) it sends per call in the extra info of the benchmark."""
+    stats = {"calls": 0, "messages": 0, "bytes": 0}
+
+    def publish_msg(self, msg_type, data=None, metadata=None, buffers=None, **keys):
+        stats["messages"] += 1
+        stats["bytes"] += _message_size(data, buffers)
+
+    monkeypatch.setattr(DummyComm, "publish_msg", publish_msg)
+
+    def run(fn, *args, setup=None, rounds=None):
+        # messages sent while preparing the benchmark do not count
+        stats["messages"] = stats["bytes"] = 0
+
+        def counted(*args):
+            stats["calls"] += 1
+            return fn(*args)
+
+        if setup is None and rounds is None:
+            result = benchmark(counted, *args)
+        else:
+
+            def setup_round():
+                messages, size = stats["messages"], stats["bytes"]
+                if setup is not None:
+                    setup()
+                # messages sent by the setup do not count
+                stats["messages"], stats["bytes"] = messages, size
+                return args, {}
+
+            result = benchmark.pedantic(counted, setup=setup_round, rounds=rounds or 5)
+        benchmark.extra_info["messages_per_call"] = stats["messages"] / stats["calls"]
+        benchmark.extra_info["bytes_per_call"] = stats["bytes"] / stats["calls"]
+        return result
+
+    yield run
+
+    # don't let the widgets of one benchmark slow down the next
+    close_widgets()
@@ -0,0 +1,70 @@
+/* Render time of a tree of widgets with event handlers, using the listeners of the renderer
+ * (createEventListeners in js/src/eventModifiers.js) versus compiling the event modifiers on every
+ * render, as the renderer did before.
+ *
+ *     cd js && npm install && node ../benchmarks/render_events.js [nodes] [renders]
+ *
+ * VUE_PATH can point to another full build of Vue 2 (one that includes the compiler).
+ */
+const fs = require('fs');
+const path = require('path');
+
+const Vue = require(process.env.VUE_PATH || require.resolve('vue/dist/vue.common.prod.js', {
+    paths: [path.join(__dirname, '..', 'js')],
+}));
+
+Vue.config.silent = true;
+Vue.config.devtools = false;
+Vue.config.productionTip = false;
+
+const nodes = parseInt(process.argv[2] || '5000', 10);
+const renders = parseInt(process.argv[3] || '20', 10);
+const events = ['click.stop', 'keyup.enter', 'mouseover.self'];
+const options = {};
+const send = () => {};
+
+function loadEventModifiers() {
+    /* eventModifiers.js is an ES module without imports */
+    const source = fs.readFileSync(path.join(__dirname, '..', 'js', 'src', 'eventModifiers.js'));
+    return import(`data:text/javascript,${encodeURIComponent(source)}`);
+}
+
+function uncachedListeners() {
+    return events.reduce((result, eventAndModifiers) => {
+        const { on } = Vue.compile(`<dummy @${eventAndModifiers}="fn"></dummy>`).render.call({
+            _c: (_, data) => data,
+            _k: Vue.prototype._k,
+            fn: e => send(eventAndModifiers, e),
+        });
+        return { ...result, ...on };
+    }, {});
+}
+
+function measure(name, createListeners) {
+    const vm = new Vue({
+        render(h) {
+            const children = [];
+            for (let i = 0; i < nodes; ++i) {
+                children.push(h('div', { on: createListeners(i) }, [String(i)]));
+            }
+            return h('div', children);
+        },
+    });
+    vm._render(); // warm up
+    const start = process.hrtime.bigint();
+    for (let i = 0; i < renders; ++i) {
+        vm._render();
+    }
+    const ms = Number(process.hrtime.bigint() - start) / 1e6 / renders;
+    console.log(`${name.padEnd(8)} ${ms.toFixed(2)} ms per render of ${nodes} nodes`);
+    vm.$destroy();
+}
+
+loadEventModifiers().then(({ createEventListeners }) => {
+    /* one per widget, as the renderer keeps one per rendered model */
+    const vueModels = Array.from({ length: nodes }, () => ({}));
+    const createHandler = eventAndModifiers => e => send(eventAndModifiers, e);
+
+    measure('before', () => uncachedListeners());
+    measure('after', i => createEventListeners(Vue, vueModels[i], events, options, createHandler));
+});
@@ -0,0 +1,58 @@
+import pytest
+
+from ipyvue import register_component_from_string
+from ipyvue.Template import get_template
+from ipyvue.VueTemplateWidget import as_refs
+from conftest import SIZES
+
+COMPONENT = """
+<template>
+  <div class="counter" @click="count += 1">{{ label }}: {{ count }}</div>
+</template>
+<script>
+module.exports = {
+  props: ["label"],
+  data: () => ({ count: %d }),
+};
+</script>
+"""
+
+
+def nested_data(size):
+    return {
+        "rows": [
+            {"id": i, "label": f"row {i}", "tags": ["a", "b"], "meta": {"x": i * 0.5}}
+            for i in range(size)
+        ]
+    }
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_as_refs(measure, size):
+    measure(as_refs, "data", nested_data(size))
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_as_refs_incremental(measure, size):
+    data = nested_data(size)
+    refs = as_refs("data", data)
+    rows = data["rows"]
+    changed = {"rows": [*rows[:-1], {**rows[-1], "label": "changed"}]}
+    measure(as_refs, "data", changed, data, refs)
+
+
+def test_get_template(measure, tmp_path):
+    path = tmp_path / "component.vue"
+    path.write_text(COMPONENT % 0)
+    get_template(str(path))
+    measure(get_template, str(path))
+
+
+def test_register_component_churn(measure):
+    count = iter(range(10**9))
+
+    def register():
+        for name in ["counter-a", "counter-b", "counter-c"]:
+            register_component_from_string(name, COMPONENT % next(count))
+
+    measure(register)
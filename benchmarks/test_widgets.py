@@ -0,0 +1,117 @@
+import itertools
+
+import pytest
+from traitlets import Unicode
+
+import ipyvue
+from ipyvue import Html, Reconciler, VueTemplate, VueWidget, h
+from conftest import SIZES, close_widgets
+
+
+def build_tree(size):
+    """A list of size nodes, rows of one VueWidget with nine Html children."""
+    return VueWidget(
+        children=[
+            VueWidget(children=[Html(tag="span", children=[str(i)]) for i in range(9)])
+            for _ in range(size // 10)
+        ]
+    )
+
+
+class Item(VueTemplate):
+    template = Unicode("<template><div>{{ label }}</div></template>").tag(sync=True)
+    label = Unicode("").tag(sync=True)
+
+
+@pytest.mark.parametrize("compact", [False, True])
+@pytest.mark.parametrize("size", SIZES)
+def test_vue_widget_tree(measure, monkeypatch, size, compact):
+    # compare bytes_per_call of compact=True with compact=False for the savings
+    monkeypatch.setattr(ipyvue, "compact_state", compact)
+    measure(build_tree, size, setup=close_widgets, rounds=3)
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_vue_template_list(measure, size):
+    def build():
+        return VueWidget(children=[Item(label=str(i)) for i in range(size)])
+
+    measure(build, setup=close_widgets, rounds=3)
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_reconcile_update(measure, size):
+    """Rerendering a keyed list in which one row changed and two rows swapped."""
+    reconciler = Reconciler(VueWidget())
+    keys = list(range(size // 10))
+
+    def render(selected):
+        return [
+            h("div", [h("span", str(i)) for i in range(9)], key=k, class_=selected(k))
+            for k in keys
+        ]
+
+    reconciler.render(render(lambda k: None))
+    keys[0], keys[-1] = keys[-1], keys[0]
+    toggle = itertools.count()
+
+    def update():
+        selected = next(toggle)
+        reconciler.render(render(lambda k: "selected" if k == selected else None))
+
+    measure(update)
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_batched_update(measure, size):
+    widgets = [VueWidget() for _ in range(size)]
+
+    def update():
+        with ipyvue.batch():
+            for widget in widgets:
+                widget.class_list.toggle("selected")
+
+    measure(update)
+
+
+def test_class_list(measure):
+    widget = VueWidget(class_="a b c d e")
+
+    def operations():
+        widget.class_list.add("f")
+        widget.class_list.toggle("b")
+        widget.class_list.replace("c", "g")
+        widget.class_list.remove("f", "g")
+        widget.class_list.toggle("b")
+        widget.class_list.add("c")
+
+    measure(operations)
+
+
+def test_on_event_rerender(measure):
+    """Registering the same handlers again, as code that rerenders does."""
+    widget = VueWidget()
+    events = [f"event{i}.stop" for i in range(50)]
+
+    def handler(*args):
+        pass
+
+    def register():
+        for event in events:
+            widget.on_event(event, handler)
+
+    register()
+    measure(register)
+
+
+def test_on_events_bulk(measure):
+    widget = VueWidget()
+    handlers = {f"event{i}.stop": lambda *args: None for i in range(50)}
+    measure(widget.on_events, handlers)
+
+
+def test_handle_event(measure):
+    widget = VueWidget()
+    widget.on_events({f"event{i}": lambda *args: None for i in range(50)})
+    content = {"event": "event49", "data": {"x": 1}}
+    measure(widget._handle_event, None, content, [])
@@ -0,0 +1,99 @@
+import threading
+from contextlib import contextmanager
+from ipywidgets.widgets.widget import _remove_buffers
+
+from .ForceLoad import force_load_instance
+
+_local = threading.local()
+
+
+def _pending_states():
+    return getattr(_local, "pending", None)
+
+
+def batching():
+    """Returns True when state updates are being held by batch()."""
+    return _pending_states() is not None
+
+
+@contextmanager
+def batch():
+    """Holds the state updates of all VueWidget and VueTemplate instances and sends
+    them as a single message when the outermost batch exits.
+
+    A trait that changes several times within the batch is sent once, with its
+    final value. Widgets created in the batch are still opened right away.
+    """
+    if batching():
+        yield
+        return
+    _local.pending = {}
+    try:
+        yield
+    finally:
+        pending = _local.pending
+        _local.pending = None
+        _flush(pending)
+
+
+@contextmanager
+def _collect():
+    """Holds the state updates made in this thread, like batch(), but doesn't send
+    them on exit. The yielded pending updates can be sent with _flush, e.g. from
+    another thread."""
+    _local.pending = {}
+    try:
+        yield _local.pending
+    finally:
+        _local.pending = None
+
+
+def _flush(pending):
+    pending = {w: keys for w, keys in pending.items() if w.comm is not None}
+    if len(pending) == 1:
+        [(widget, keys)] = pending.items()
+        widget.send_state(keys)
+        return
+
+    updates = []
+    buffers = []
+    for widget, keys in pending.items():
+        state, buffer_paths, widget_buffers = _remove_buffers(widget.get_state(keys))
+        updates.append(
+            {
+                "model_id": widget.model_id,
+                "state": state,
+                "buffer_paths": buffer_paths,
+                "buffer_start": len(buffers),
+            }
+        )
+        buffers.extend(widget_buffers)
+        widget._state_sent(keys)
+    if updates:
+        force_load_instance.send({"batch": updates}, buffers)
+
+
+class BatchedSync(object):
+    """Lets batch() hold the state updates of a widget."""
+
+    def send_state(self, key=None):
+        if key is None:
+            keys = self.keys
+        elif isinstance(key, str):
+            keys = [key]
+        else:
+            keys = list(key)
+
+        pending = _pending_states()
+        if pending is not None:
+            pending.setdefault(self, set()).update(keys)
+            return
+        super().send_state(key)
+        self._state_sent(keys)
+
+    def _state_sent(self, keys):
+        """Called after the state of keys is sent to the frontend."""
+        pass
+
+
+__all__ = ["batch", "batching"]
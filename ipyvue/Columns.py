@@ -0,0 +1,160 @@
+import sys
+from array import array
+from traitlets import TraitType, TraitError
+
+FORMAT = "ipyvue.columns"
+
+# dtype on the wire -> array module typecode
+_TYPECODES = {
+    "bool": "B",
+    "int8": "b",
+    "uint8": "B",
+    "int16": "h",
+    "uint16": "H",
+    "int32": "i",
+    "uint32": "I",
+    "float32": "f",
+    "float64": "d",
+}
+
+_INT32_RANGE = (-(2**31), 2**31 - 1)
+
+
+def _is_numpy(values):
+    numpy = sys.modules.get("numpy")
+    return numpy is not None and isinstance(values, numpy.ndarray)
+
+
+def _typed_buffer(values, typecode):
+    buffer = array(typecode, values)
+    if sys.byteorder == "big":
+        buffer.byteswap()
+    return memoryview(buffer).cast("B")
+
+
+def _encode_numpy(values):
+    import numpy as np
+
+    kind = values.dtype.kind
+    if kind == "b":
+        dtype, values = "bool", values.astype(np.uint8)
+    elif kind in "iu" and values.dtype.itemsize == 8:
+        # javascript numbers are doubles, BigInt64Array is not usable in templates
+        in_int32_range = len(values) == 0 or (
+            _INT32_RANGE[0] <= values.min() and values.max() <= _INT32_RANGE[1]
+        )
+        dtype = "int32" if in_int32_range else "float64"
+        values = values.astype(dtype)
+    else:
+        dtype = values.dtype.name
+    values = np.ascontiguousarray(values, dtype=values.dtype.newbyteorder("<"))
+    return {"dtype": dtype, "buffer": memoryview(values).cast("B")}
+
+
+def _encode_column(values):
+    if _is_numpy(values):
+        if values.dtype.kind in "biuf" and values.dtype.name != "float16":
+            return _encode_numpy(values)
+        values = values.tolist()
+    elif hasattr(values, "to_numpy"):
+        # pandas Series
+        return _encode_column(values.to_numpy())
+
+    values = list(values)
+    if all(isinstance(v, bool) for v in values):
+        return {"dtype": "bool", "buffer": _typed_buffer(values, "B")}
+    if all(isinstance(v, int) and not isinstance(v, bool) for v in values):
+        if all(_INT32_RANGE[0] <= v <= _INT32_RANGE[1] for v in values):
+            return {"dtype": "int32", "buffer": _typed_buffer(values, "i")}
+    if all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values):
+        return {"dtype": "float64", "buffer": _typed_buffer(values, "d")}
+
+    # dictionary encoding: every distinct value is sent once, None becomes code -1
+    categories = {}
+    codes = [
+        -1 if v is None else categories.setdefault(str(v), len(categories))
+        for v in values
+    ]
+    return {
+        "dtype": "category",
+        "categories": list(categories),
+        "codes": _typed_buffer(codes, "i"),
+    }
+
+
+def _decode_column(column):
+    if column["dtype"] == "category":
+        categories = column["categories"]
+        codes = _decode_buffer(column["codes"], "i")
+        return [None if code < 0 else categories[code] for code in codes]
+    values = _decode_buffer(column["buffer"], _TYPECODES[column["dtype"]])
+    if column["dtype"] == "bool":
+        return [bool(v) for v in values]
+    return list(values)
+
+
+def _decode_buffer(buffer, typecode):
+    values = array(typecode)
+    values.frombytes(bytes(buffer))
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+def _columns_to_json(value, obj):
+    # None is sent as an empty table, so the frontend always gets a row view
+    if value is None:
+        value = {}
+    if hasattr(value, "columns") and hasattr(value, "to_numpy"):
+        # pandas DataFrame
+        value = {str(name): value[name] for name in value.columns}
+    columns = list(value)
+    return {
+        "format": FORMAT,
+        "columns": columns,
+        "length": len(value[columns[0]]) if columns else 0,
+        "data": {name: _encode_column(value[name]) for name in columns},
+    }
+
+
+def _json_to_columns(value, obj):
+    return {name: _decode_column(value["data"][name]) for name in value["columns"]}
+
+
+columns_serialization = {
+    "to_json": _columns_to_json,
+    "from_json": _json_to_columns,
+}
+
+
+class Columns(TraitType):
+    """Tabular data, sent to the frontend column by column as binary buffers.
+
+    Accepts a dict mapping column names to equally long sequences (lists or NumPy
+    arrays) or a pandas DataFrame. Numeric columns are sent as one typed array
+    buffer each, other columns are dictionary encoded. In a ``VueTemplate``, the
+    value is available as a read-only array of row objects, which are only
+    created when accessed.
+    """
+
+    default_value = None
+    info_text = "a dict of equally long columns or a pandas DataFrame"
+
+    def __init__(self, default_value=None, allow_none=True, **kwargs):
+        super().__init__(default_value=default_value, allow_none=allow_none, **kwargs)
+        self.tag(**columns_serialization)
+
+    def validate(self, obj, value):
+        if hasattr(value, "columns") and hasattr(value, "to_numpy"):
+            return value
+        if not isinstance(value, dict):
+            self.error(obj, value)
+        if len({len(column) for column in value.values()}) > 1:
+            raise TraitError(
+                f"The columns of the '{self.name}' trait of {obj!r} should all have"
+                " the same length"
+            )
+        return value
+
+
+__all__ = ["Columns", "columns_serialization"]
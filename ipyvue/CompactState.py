@@ -0,0 +1,105 @@
+from traitlets import Dict, Instance, Unicode
+from ipywidgets import Widget
+from ipywidgets.widgets.widget import widget_serialization
+
+from ._version import semver
+
+# the frontend needs these to create the model, so they are always sent
+_ALWAYS_SENT = {
+    "_model_name",
+    "_model_module",
+    "_model_module_version",
+    "_view_name",
+    "_view_module",
+    "_view_module_version",
+    "_defaults",
+}
+
+
+class ClassDefaults(Widget):
+    """The default state of a widget class, shared by all its instances."""
+
+    _model_name = Unicode("ClassDefaultsModel").tag(sync=True)
+    _model_module = Unicode("jupyter-vue").tag(sync=True)
+    _model_module_version = Unicode(semver).tag(sync=True)
+
+    values = Dict().tag(sync=True)
+
+
+_class_defaults = {}
+
+
+def _creates_widget(trait):
+    # the default of e.g. layout is a new widget
+    klass = getattr(trait, "klass", None)
+    return isinstance(klass, type) and issubclass(klass, Widget)
+
+
+def _static_defaults(widget):
+    # traits with a dynamic default are always sent, and so are traits with a
+    # custom serialization (e.g. widget references, which the frontend
+    # deserializes), unless their default is empty
+    # traitlets keeps the generators of each class in its own dict
+    generators = set()
+    for klass in type(widget).__mro__:
+        generators.update(vars(klass).get("_trait_default_generators", {}))
+    values = {}
+    for name, trait in widget.traits(sync=True).items():
+        if name in _ALWAYS_SENT or name in generators or _creates_widget(trait):
+            continue
+        default = trait.default() if hasattr(trait, "default") else trait.default_value
+        to_json = trait.metadata.get("to_json", widget._trait_to_json)
+        value = to_json(default, widget)
+        if "to_json" in trait.metadata and value not in (None, [], {}):
+            continue
+        values[name] = value
+    return values
+
+
+def class_defaults(widget):
+    """Returns the ClassDefaults widget of the class of widget."""
+    cls = type(widget)
+    if cls not in _class_defaults or _class_defaults[cls].comm is None:
+        _class_defaults[cls] = ClassDefaults(values=_static_defaults(widget))
+    return _class_defaults[cls]
+
+
+def defaults_trait():
+    return Instance(ClassDefaults, allow_none=True).tag(
+        sync=True, **widget_serialization
+    )
+
+
+class CompactState(object):
+    """Leaves traits with their default value out of the state sent when the widget
+    is opened, if ipyvue.compact_state is set. The frontend takes them from a
+    ClassDefaults widget, which is sent once per class.
+
+    Widgets using this need a ``_defaults`` trait, see ``defaults_trait()``."""
+
+    def open(self):
+        import ipyvue
+
+        if not ipyvue.compact_state or self.comm is not None:
+            super().open()
+            return
+        self._defaults = class_defaults(self)
+        self._compact_open = True
+        try:
+            super().open()
+        finally:
+            self._compact_open = False
+
+    def get_state(self, key=None, drop_defaults=False):
+        state = super().get_state(key, drop_defaults)
+        if key is not None or not getattr(self, "_compact_open", False):
+            return state
+        defaults = self._defaults.values
+        return {
+            name: value
+            for name, value in state.items()
+            if name not in defaults or defaults[name] != value
+        }
+
+
+__all__ = ["ClassDefaults", "CompactState", "defaults_trait"]
@@ -0,0 +1,48 @@
+from ipywidgets.widgets.widget import widget_serialization
+
+
+class Element(object):
+    """A plain HTML or Vue element in the children of a VueWidget.
+
+    Unlike a widget, an element has no comm and no traits: it is sent as part of
+    the state of the widget it is a child of, which makes it much cheaper for
+    large trees. Elements can't have event handlers or a v_model, and changing
+    an element is not synced, assign new children to the parent widget instead.
+    Children of an element can be strings, elements and widgets.
+    """
+
+    __slots__ = ("tag", "children", "class_", "style_", "attributes")
+
+    def __init__(self, tag, children=(), class_=None, style_=None, attributes=None):
+        self.tag = tag
+        self.children = list(children)
+        self.class_ = class_
+        self.style_ = style_
+        self.attributes = attributes
+
+    def __repr__(self):
+        return f"Element({self.tag!r}, children={self.children!r})"
+
+
+def _element_to_json(x, obj):
+    if isinstance(x, Element):
+        element = {"tag": x.tag, "children": _element_to_json(x.children, obj)}
+        for name in ("class_", "style_", "attributes"):
+            value = getattr(x, name)
+            if value is not None:
+                element[name] = value
+        return {"element": element}
+    if isinstance(x, (list, tuple)):
+        return [_element_to_json(v, obj) for v in x]
+    if isinstance(x, dict):
+        return {k: _element_to_json(v, obj) for k, v in x.items()}
+    return widget_serialization["to_json"](x, obj)
+
+
+# like widget_serialization, with Element support
+element_serialization = {
+    "to_json": _element_to_json,
+    "from_json": widget_serialization["from_json"],
+}
+
+__all__ = ["Element", "element_serialization"]
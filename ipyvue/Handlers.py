@@ -0,0 +1,99 @@
+import asyncio
+import inspect
+import logging
+
+log = logging.getLogger("ipyvue")
+
+SYNC_POLICIES = ("immediate", "tick", "raf", "debounce", "throttle")
+
+
+def event_options(fields=None, policy="immediate", wait=100):
+    """Returns the options of an event handler as sent to the frontend, or None
+    when all options have their default value."""
+    if policy not in SYNC_POLICIES:
+        raise ValueError(f"Unknown policy {policy!r}, use one of {SYNC_POLICIES}")
+    if isinstance(fields, str):
+        raise TypeError("fields should be a list of field names, not a string")
+    options = {}
+    if fields is not None:
+        options["fields"] = list(fields)
+    if policy != "immediate":
+        options["policy"] = policy
+        options["wait"] = wait
+    return options or None
+
+
+def event_handler(fields=None, policy="immediate", wait=100, cancel_running=False):
+    """Sets the options of a ``vue_`` method of a VueTemplate, like the options of
+    VueWidget.on_event.
+
+    :param fields: the fields of the event (or value) passed to the method to send,
+        e.g. ``["clientX", "target.value"]``. By default, all fields up to two
+        levels deep are sent, which is a lot for DOM events.
+    :param policy: how the browser limits the rate of events: ``immediate``, or
+        send only the latest event per ``tick``, per animation frame (``raf``),
+        when no event happened for ``wait`` ms (``debounce``) or at most once
+        every ``wait`` ms (``throttle``).
+    :param wait: in ms, for the debounce and throttle policies.
+    :param cancel_running: for ``async def`` methods, cancel a still running call
+        when a new event comes in, so only the latest event is handled.
+    """
+    options = event_options(fields, policy, wait)
+
+    def decorator(method):
+        method._ipyvue_event_options = options
+        method._ipyvue_cancel_running = cancel_running
+        return method
+
+    return decorator
+
+
+async def _await(awaitable):
+    return await awaitable
+
+
+def run_handler(widget, key, result, cancel_running=False):
+    """Runs the awaitable returned by an async event handler in a task on the
+    running event loop, so it doesn't block the handling of other messages.
+
+    With cancel_running, the still running tasks of earlier events with the same
+    key are cancelled first. Without a running loop, e.g. when fire_event is
+    called from a script, the awaitable is run to completion.
+    """
+    if not inspect.isawaitable(result):
+        return result
+
+    tasks = widget._handler_tasks.setdefault(key, set())
+    if cancel_running:
+        for task in tasks:
+            task.cancel()
+
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(_await(result))
+
+    task = asyncio.ensure_future(result, loop=loop)
+    tasks.add(task)
+
+    def done(task):
+        tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            log.error(
+                f"Exception in event handler {key!r} of {widget!r}",
+                exc_info=task.exception(),
+            )
+
+    task.add_done_callback(done)
+    return task
+
+
+def cancel_handlers(widget):
+    """Cancels the running async event handlers of widget."""
+    # a widget of which __init__ failed is closed when it's garbage collected
+    for tasks in getattr(widget, "_handler_tasks", {}).values():
+        for task in tasks:
+            task.cancel()
+
+
+__all__ = ["event_handler"]
@@ -0,0 +1,104 @@
+"""Minimal RFC 6902 (JSON Patch) support for incremental trait syncing.
+
+Only the ``add``, ``remove`` and ``replace`` operations are generated and
+understood, which is all that is needed to describe the difference between
+two JSON-like documents.
+"""
+import copy
+
+
+def _escape(key):
+    return str(key).replace("~", "~0").replace("/", "~1")
+
+
+def _unescape(token):
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def _split_pointer(pointer):
+    if not pointer:
+        return []
+    return [_unescape(token) for token in pointer[1:].split("/")]
+
+
+def _diff(old, new, path, ops):
+    if old is new:
+        return
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key in old:
+            if key not in new:
+                ops.append({"op": "remove", "path": f"{path}/{_escape(key)}"})
+        for key, value in new.items():
+            item_path = f"{path}/{_escape(key)}"
+            if key in old:
+                _diff(old[key], value, item_path, ops)
+            else:
+                ops.append({"op": "add", "path": item_path, "value": value})
+    elif isinstance(old, (list, tuple)) and isinstance(new, (list, tuple)):
+        common = min(len(old), len(new))
+        for index in range(common):
+            _diff(old[index], new[index], f"{path}/{index}", ops)
+        # remove from the back, so the indices of the remaining items stay valid
+        for index in range(len(old) - 1, common - 1, -1):
+            ops.append({"op": "remove", "path": f"{path}/{index}"})
+        for index in range(common, len(new)):
+            ops.append({"op": "add", "path": f"{path}/{index}", "value": new[index]})
+    elif type(old) is not type(new) or old != new:
+        ops.append({"op": "replace", "path": path, "value": new})
+
+
+def make_patch(old, new):
+    """Return the list of patch operations that turns ``old`` into ``new``.
+
+    Subtrees that are the same object in both documents are skipped without
+    being compared.
+    """
+    ops = []
+    _diff(old, new, "", ops)
+    return ops
+
+
+def _apply_op(container, keys, op):
+    # copy only the containers along the path, the rest is shared
+    if isinstance(container, dict):
+        container = dict(container)
+        key = keys[0]
+    else:
+        container = list(container)
+        key = len(container) if keys[0] == "-" else int(keys[0])
+
+    if len(keys) > 1:
+        container[key] = _apply_op(container[key], keys[1:], op)
+    elif op["op"] == "remove":
+        del container[key]
+    elif op["op"] == "add" and isinstance(container, list):
+        container.insert(key, op["value"])
+    elif op["op"] in ("add", "replace"):
+        container[key] = op["value"]
+    else:
+        raise ValueError(f"Unsupported patch operation: {op['op']}")
+    return container
+
+
+def apply_patch(document, ops, copy_values=False):
+    """Return a new document with ``ops`` applied to ``document``.
+
+    ``document`` itself is not modified: only the containers along the patched
+    paths are copied, unchanged subtrees are shared with the original. When
+    ``copy_values`` is set, the values in the operations are deep-copied so the
+    result does not share them with the caller.
+    """
+    for op in ops:
+        if copy_values and "value" in op:
+            op = {**op, "value": copy.deepcopy(op["value"])}
+        keys = _split_pointer(op["path"])
+        if not keys:
+            if op["op"] == "remove":
+                raise ValueError("Cannot remove the root of a document")
+            document = op["value"]
+        else:
+            document = _apply_op(document, keys, op)
+    return document
+
+
+__all__ = ["make_patch", "apply_patch"]
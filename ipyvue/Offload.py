@@ -0,0 +1,119 @@
+import asyncio
+import functools
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from importlib import import_module
+
+from .Batch import _collect, batch
+
+EXECUTORS = ("thread", "process")
+
+
+def _call_collecting(fn, *args):
+    # runs in a worker thread, the state updates are sent from the kernel thread,
+    # also when fn raises
+    with _collect() as pending:
+        try:
+            return fn(*args), pending, None
+        except Exception as e:
+            return None, pending, e
+
+
+def _call_by_name(module_name, qualname, *args):
+    # runs in a worker process, where the method is looked up by name, since the
+    # decorated method (and the widget) can't be pickled
+    obj = import_module(module_name)
+    for name in qualname.split("."):
+        obj = getattr(obj, name)
+    return obj.__wrapped__(*args), {}, None
+
+
+def _update_in_flight(widget, event, delta):
+    in_flight = dict(widget._in_flight)
+    count = in_flight.get(event, 0) + delta
+    if count:
+        in_flight[event] = count
+    else:
+        in_flight.pop(event, None)
+    widget._in_flight = in_flight
+
+
+def offload(executor="thread", max_workers=1):
+    """Runs a ``vue_`` method of a VueTemplate in a pool of worker threads or
+    processes, so the kernel keeps handling messages while it runs.
+
+    The number of calls in progress (running or waiting for a worker) is kept in
+    the ``_in_flight`` trait of the template, by event, which the template can use
+    as ``$inFlight`` to show a spinner, e.g. ``<v-btn :loading="!!$inFlight.compute">``.
+
+    The method can return a dict of trait values, which are set on the kernel
+    thread when it returns. Traits set by the method itself are set on the worker
+    thread, so their observers run there too; only the messages are sent from the
+    kernel thread. Prefer returning the values.
+
+    A process can't access the widget, so there the method has to be a
+    ``@staticmethod`` (below ``@offload``), and the class should be importable.
+
+    :param executor: ``"thread"`` or ``"process"``.
+    :param max_workers: the maximum number of calls of the method that run at the
+        same time, for all instances of the class. Further calls wait.
+    """
+    if executor not in EXECUTORS:
+        raise ValueError(f"Unknown executor {executor!r}, use one of {EXECUTORS}")
+
+    def decorator(method):
+        if executor == "process":
+            if not isinstance(method, staticmethod):
+                raise TypeError(
+                    f"{method.__qualname__}: offload(executor='process') needs a "
+                    "@staticmethod, since the widget isn't available in a process"
+                )
+            method = method.__func__
+        pool = None
+        name = method.__name__
+        event = name[4:] if name.startswith("vue_") else name
+
+        @functools.wraps(method)
+        async def wrapper(self, *args):
+            nonlocal pool
+            if pool is None:
+                pool_class = (
+                    ThreadPoolExecutor if executor == "thread" else ProcessPoolExecutor
+                )
+                pool = pool_class(max_workers=max_workers)
+
+            if executor == "thread":
+                future = pool.submit(_call_collecting, method, self, *args)
+            else:
+                future = pool.submit(
+                    _call_by_name, method.__module__, method.__qualname__, *args
+                )
+
+            loop = asyncio.get_running_loop()
+            _update_in_flight(self, event, 1)
+
+            def finished():
+                with batch():
+                    _update_in_flight(self, event, -1)
+                    if future.cancelled() or future.exception() is not None:
+                        return
+                    result, pending, error = future.result()
+                    for widget, keys in pending.items():
+                        widget.send_state(keys)
+                    if error is None and isinstance(result, dict):
+                        for trait, value in result.items():
+                            setattr(self, trait, value)
+
+            # registered before awaiting, so the updates are done when the await
+            # returns
+            future.add_done_callback(lambda _: loop.call_soon_threadsafe(finished))
+            result, _, error = await asyncio.wrap_future(future)
+            if error is not None:
+                raise error
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+__all__ = ["offload"]
@@ -0,0 +1,188 @@
+"""Ahead-of-time compilation of Vue templates to render functions.
+
+Compiling is done with ``vue-template-compiler`` in a Node.js process, so both
+need to be available, otherwise the frontend compiles the templates as usual.
+Results are cached on disk, keyed by the hash of the source, so they survive
+kernel restarts. Run ``ipyvue-precompile <files or directories>`` to fill the
+cache ahead of time.
+"""
+import hashlib
+import json
+import logging
+import os
+import subprocess
+import sys
+
+log = logging.getLogger("ipyvue")
+
+# reads a json list of sources from stdin, writes a json list of
+# {render, staticRenderFns} (or null when the source can't be precompiled)
+_COMPILE_SCRIPT = """
+const compiler = require('vue-template-compiler');
+let input = '';
+process.stdin.on('data', chunk => { input += chunk; });
+process.stdin.on('end', () => {
+    const results = JSON.parse(input).map((source) => {
+        const sfc = compiler.parseComponent(source, { pad: 'line' });
+        /* scoped styles of components are applied by modifying the template */
+        if (sfc.styles.some(style => style.scoped)) {
+            return null;
+        }
+        const isSfc = sfc.template || sfc.script || sfc.styles.length;
+        const content = isSfc ? sfc.template && sfc.template.content : source;
+        if (!content) {
+            return null;
+        }
+        const { render, staticRenderFns, errors } = compiler.compile(content);
+        return errors.length ? null : { render, staticRenderFns };
+    });
+    process.stdout.write(JSON.stringify(results));
+});
+"""
+
+_VERSION_SCRIPT = """
+process.stdout.write(require('vue-template-compiler/package.json').version);
+"""
+
+_memory_cache = {}
+_node_failed = False
+_compiler_version = None
+
+
+def _cache_dir():
+    if "IPYVUE_CACHE_DIR" in os.environ:
+        return os.environ["IPYVUE_CACHE_DIR"]
+    base = os.environ.get("XDG_CACHE_HOME", os.path.join("~", ".cache"))
+    return os.path.join(os.path.expanduser(base), "ipyvue", "precompiled")
+
+
+def _hash(source, version):
+    # render functions only work with the Vue version of the compiler
+    key = f"{version}\0{source}"
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def _read_cache(key):
+    if key in _memory_cache:
+        return _memory_cache[key]
+    try:
+        with open(os.path.join(_cache_dir(), key + ".json"), encoding="utf-8") as f:
+            _memory_cache[key] = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return _memory_cache[key]
+
+
+def _write_cache(key, compiled):
+    _memory_cache[key] = compiled
+    try:
+        os.makedirs(_cache_dir(), exist_ok=True)
+        path = os.path.join(_cache_dir(), key + ".json")
+        # write and rename, so concurrent kernels never read a partial file
+        with open(path + f".{os.getpid()}.tmp", "w", encoding="utf-8") as f:
+            json.dump(compiled, f)
+        os.replace(path + f".{os.getpid()}.tmp", path)
+    except OSError as e:
+        log.warning(f"could not write precompiled template cache: {e}")
+
+
+def _run_node(script, input=""):
+    """Runs script with node and returns its output, or None if that failed."""
+    global _node_failed
+    if _node_failed:
+        return None
+    env = os.environ.copy()
+    # in a development install, the compiler can be found in js/node_modules
+    node_modules = os.path.join(os.path.dirname(__file__), "..", "js", "node_modules")
+    env["NODE_PATH"] = os.pathsep.join(
+        filter(None, [env.get("NODE_PATH"), os.path.abspath(node_modules)])
+    )
+    try:
+        result = subprocess.run(
+            ["node", "-e", script],
+            input=input,
+            capture_output=True,
+            text=True,
+            env=env,
+            check=True,
+        )
+    except OSError as e:
+        # node is not installed, don't try again
+        _node_failed = True
+        log.warning(f"could not precompile templates, node is needed: {e}")
+        return None
+    except subprocess.CalledProcessError as e:
+        log.warning(
+            "could not precompile templates, vue-template-compiler is needed: "
+            f"{e.stderr or e}"
+        )
+        return None
+    return result.stdout
+
+
+def _get_compiler_version():
+    global _compiler_version
+    if _compiler_version is None:
+        _compiler_version = _run_node(_VERSION_SCRIPT)
+    return _compiler_version
+
+
+def _compile_with_node(sources):
+    output = _run_node(_COMPILE_SCRIPT, json.dumps(sources))
+    if output is None:
+        return [None] * len(sources)
+    return json.loads(output)
+
+
+def precompile_sources(sources):
+    """Returns the compiled render functions for each of the sources, as a dict
+    with the render and staticRenderFns source code, or None if a source can't be
+    precompiled."""
+    version = _get_compiler_version()
+    if version is None:
+        return [None] * len(sources)
+    keys = [_hash(source, version) for source in sources]
+    results = [_read_cache(key) for key in keys]
+    missing = [i for i, result in enumerate(results) if result is None]
+    if missing:
+        compiled = _compile_with_node([sources[i] for i in missing])
+        for i, result in zip(missing, compiled):
+            if result is not None:
+                _write_cache(keys[i], result)
+            results[i] = result
+    return results
+
+
+def precompile(source):
+    """Returns the compiled render functions of a single template, or None."""
+    return precompile_sources([source])[0]
+
+
+def main(argv=None):
+    """Precompiles all .vue files in the given files and directories."""
+    paths = sys.argv[1:] if argv is None else argv
+    if not paths:
+        print("usage: ipyvue-precompile <file or directory>...", file=sys.stderr)
+        return 2
+
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                files.extend(os.path.join(root, n) for n in names if n.endswith(".vue"))
+        else:
+            files.append(path)
+
+    sources = []
+    for file_name in files:
+        with open(file_name, encoding="utf-8") as f:
+            sources.append(f.read())
+    results = precompile_sources(sources)
+    for file_name, result in zip(files, results):
+        print(f"{'compiled' if result else 'skipped '} {file_name}")
+    print(f"cache: {_cache_dir()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
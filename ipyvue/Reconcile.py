@@ -0,0 +1,199 @@
+from ipywidgets import Widget
+
+from .Batch import batch
+from .Html import Html
+
+
+class Node(object):
+    """The description of a widget, as returned by h()."""
+
+    __slots__ = ("tag", "children", "key", "events", "traits")
+
+    def __init__(self, tag, children, key, events, traits):
+        self.tag = tag
+        self.children = children
+        self.key = key
+        self.events = events
+        self.traits = traits
+
+    def __repr__(self):
+        return f"h({self.tag!r}, key={self.key!r})"
+
+
+def h(tag, children=None, key=None, events=None, **traits):
+    """Describes a widget for Reconciler.render().
+
+    :param tag: an HTML or Vue tag, which is rendered as an ``ipyvue.Html``, or a
+        widget class, e.g. an ipyvuetify component.
+    :param children: a node, string or widget, or a list of them. None entries are
+        left out, which is convenient for conditional children.
+    :param key: identifies the node among its siblings, so the widget is kept when
+        siblings are added, removed or reordered. Without a key, nodes are matched
+        by position.
+    :param events: a dict mapping event_and_modifiers to callbacks, see on_event.
+    :param traits: the traits of the widget.
+    """
+    if children is None:
+        children = []
+    elif not isinstance(children, (list, tuple)):
+        children = [children]
+    children = [child for child in children if child is not None]
+    return Node(tag, children, key, events or {}, traits)
+
+
+class _Mounted(object):
+    """A node and the widget created for it."""
+
+    __slots__ = ("node", "widget", "children")
+
+    def __init__(self, node, widget, children):
+        self.node = node
+        self.widget = widget
+        self.children = children
+
+
+def _match_key(node, index):
+    return ("key", node.key) if node.key is not None else ("index", index)
+
+
+def _children_values(records):
+    return [r.widget if isinstance(r, _Mounted) else r for r in records]
+
+
+def _mount(node):
+    children = [_mount(c) if isinstance(c, Node) else c for c in node.children]
+    traits = dict(node.traits)
+    if children:
+        traits["children"] = _children_values(children)
+    if node.events:
+        # registered below, this avoids an update right after the widget is opened
+        traits["_events"] = list(node.events)
+    if isinstance(node.tag, str):
+        widget = Html(tag=node.tag, **traits)
+    else:
+        widget = node.tag(**traits)
+    for event_and_modifiers, callback in node.events.items():
+        widget._register_event(event_and_modifiers, callback, False)
+    return _Mounted(node, widget, children)
+
+
+def _unmount(record):
+    if isinstance(record, _Mounted):
+        for child in record.children:
+            _unmount(child)
+        record.widget.close()
+
+
+def _patch(record, node):
+    widget = record.widget
+    for name, value in node.traits.items():
+        if getattr(widget, name) != value:
+            setattr(widget, name, value)
+    for name in record.node.traits.keys() - node.traits.keys():
+        setattr(widget, name, widget.trait_defaults(name))
+
+    if record.node.events or node.events:
+        removed = record.node.events.keys() - node.events.keys()
+        if removed:
+            widget.on_events({name: None for name in removed}, remove=True)
+        widget.on_events(node.events)
+
+    children = _reconcile_children(record.children, node.children)
+    values = _children_values(children)
+    if (children or record.children) and values != list(widget.children):
+        widget.children = values
+
+    record.node = node
+    record.children = children
+    return record
+
+
+def _check_keys(nodes):
+    # siblings are matched by key, a duplicate would leave a widget unmounted
+    keys = set()
+    for node in nodes:
+        if not isinstance(node, Node):
+            continue
+        if node.key is not None:
+            if node.key in keys:
+                raise ValueError(
+                    f"Duplicate key {node.key!r} in the children of a node"
+                )
+            keys.add(node.key)
+        _check_keys(node.children)
+
+
+def _reconcile_children(records, children):
+    """Returns the records for children, reusing the widgets of records."""
+    previous = {}
+    index = 0
+    for record in records:
+        if isinstance(record, _Mounted):
+            key = _match_key(record.node, index)
+            if key in previous:
+                raise ValueError(f"Duplicate key {key[1]!r} in the children of a node")
+            previous[key] = record
+            index += 1
+
+    result = []
+    index = 0
+    for child in children:
+        if not isinstance(child, Node):
+            result.append(child)
+            continue
+        record = previous.pop(_match_key(child, index), None)
+        index += 1
+        if record is not None and record.node.tag == child.tag:
+            result.append(_patch(record, child))
+        else:
+            if record is not None:
+                _unmount(record)
+            result.append(_mount(child))
+
+    for record in previous.values():
+        _unmount(record)
+    return result
+
+
+class Reconciler(object):
+    """Keeps the children of a widget in sync with a tree of nodes built by h().
+
+    Each call to render() compares the new tree with the previous one: widgets of
+    matching nodes are kept and only their changed traits are sent, new nodes get a
+    new widget and the widgets of removed nodes are closed. All updates are sent
+    in a single message.
+
+    Example::
+
+        todo_list = Reconciler(ipyvue.Html(tag="ul"))
+        todo_list.render([h("li", todo.text, key=todo.id) for todo in todos])
+    """
+
+    def __init__(self, container):
+        self.container = container
+        self._records = []
+
+    def render(self, children):
+        """Updates the children of the container to match children, a node or a
+        list of nodes, strings and widgets."""
+        if children is None or isinstance(children, (Node, str, Widget)):
+            children = [children]
+        children = [child for child in children if child is not None]
+        # before anything is changed
+        _check_keys(children)
+        with batch():
+            self._records = _reconcile_children(self._records, children)
+            values = _children_values(self._records)
+            if values != list(self.container.children):
+                self.container.children = values
+        return self.container
+
+    def close(self):
+        """Closes the widgets created by the reconciler."""
+        for record in self._records:
+            _unmount(record)
+        self._records = []
+        self.container.children = []
+
+
+__all__ = ["h", "Reconciler"]
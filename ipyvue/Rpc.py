@@ -0,0 +1,106 @@
+import inspect
+import json
+from weakref import WeakKeyDictionary
+
+from ipywidgets.widgets.widget import _put_buffers, _remove_buffers
+
+from .Handlers import run_handler
+
+
+def rpc(method=None, cache_ttl=None):
+    """Makes a method of a VueTemplate callable from the template, which gets the
+    return value as a promise: ``const rows = await this.$py.load_rows(0, 100)``.
+
+    Calls made in the same tick are sent in a single message. The method can be an
+    ``async def`` function. An exception raised by the method rejects the promise.
+    ``bytes`` and ``memoryview`` values in the result, and ArrayBuffers and typed
+    arrays in the arguments, are sent as binary buffers.
+
+    :param cache_ttl: in seconds, results are cached in the browser per arguments
+        for this long.
+    """
+
+    def decorator(method):
+        method._ipyvue_rpc = {"cache_ttl": cache_ttl} if cache_ttl else {}
+        return method
+
+    return decorator if method is None else decorator(method)
+
+
+_class_methods = WeakKeyDictionary()
+
+
+def rpc_methods(cls):
+    """Returns the methods of cls decorated with rpc, and their options."""
+    if cls not in _class_methods:
+        methods = {}
+        # from base to subclass, so overridden methods replace (or remove) the base
+        for klass in reversed(cls.__mro__):
+            for name, value in vars(klass).items():
+                options = getattr(value, "_ipyvue_rpc", None)
+                if options is not None:
+                    methods[name] = options
+                else:
+                    methods.pop(name, None)
+        _class_methods[cls] = methods
+    return dict(_class_methods[cls])
+
+
+def _error(e):
+    return f"{type(e).__name__}: {e}"
+
+
+def _serialize(result):
+    # a result that can't be sent is turned into an error, so its promise is still
+    # settled, and the other results of the message are sent
+    state, buffer_paths, buffers = _remove_buffers(result)
+    try:
+        json.dumps(state)
+    except (TypeError, ValueError) as e:
+        return {"id": result["id"], "error": _error(e)}, [], []
+    return state, buffer_paths, buffers
+
+
+def _send_results(widget, results):
+    states, buffer_paths, buffers = [], [], []
+    for index, result in enumerate(results):
+        state, paths, result_buffers = _serialize(result)
+        states.append(state)
+        buffer_paths.extend(["rpc_results", index, *path] for path in paths)
+        buffers.extend(result_buffers)
+    widget.send({"rpc_results": states, "buffer_paths": buffer_paths}, buffers)
+
+
+async def _send_when_done(widget, call_id, awaitable):
+    try:
+        result = {"id": call_id, "result": await awaitable}
+    except Exception as e:
+        result = {"id": call_id, "error": _error(e)}
+    _send_results(widget, [result])
+
+
+def handle_rpc(widget, content, buffers):
+    """Calls the methods requested by the frontend and sends the results of the
+    methods that return right away in a single message."""
+    _put_buffers(content, content.get("buffer_paths", []), buffers or [])
+    results = []
+    for call in content["rpc"]:
+        call_id, name = call["id"], call["method"]
+        if name not in widget._rpc_methods:
+            error = f"{name!r} is not an rpc method of {type(widget).__name__}"
+            results.append({"id": call_id, "error": error})
+            continue
+        try:
+            result = getattr(widget, name)(*call.get("args", []))
+        except Exception as e:
+            results.append({"id": call_id, "error": _error(e)})
+            continue
+        if inspect.isawaitable(result):
+            run_handler(widget, "rpc", _send_when_done(widget, call_id, result))
+        else:
+            results.append({"id": call_id, "result": result})
+    if results:
+        _send_results(widget, results)
+
+
+__all__ = ["rpc"]
@@ -0,0 +1,109 @@
+"""Cache of the sources of template and component files.
+
+Files are read once, and read again only when their modification time or size
+changed. Within ``validate_interval`` seconds after a file was checked, the
+cached source is used without checking the file again; the file watcher
+invalidates changed files right away. With ``IPYVUE_SOURCE_CACHE_DIR`` set, the
+sources are also stored in that directory, which can be shared by kernels on
+the same machine, so a slow (network) file system only needs to be asked for
+the file status.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+log = logging.getLogger("ipyvue")
+
+# seconds a checked file is trusted without checking it again
+validate_interval = 1.0
+
+# path -> {"mtime": ..., "size": ..., "source": ..., "checked": ...}
+_entries = {}
+_lock = threading.Lock()
+
+
+def _index_path(path):
+    directory = os.environ.get("IPYVUE_SOURCE_CACHE_DIR")
+    if not directory:
+        return None
+    key = hashlib.sha256(path.encode("utf-8")).hexdigest()
+    return os.path.join(directory, key + ".json")
+
+
+def _read_index(path, mtime, size):
+    index_path = _index_path(path)
+    if index_path is None:
+        return None
+    try:
+        with open(index_path, encoding="utf-8") as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if (entry.get("path"), entry.get("mtime"), entry.get("size")) != (
+        path,
+        mtime,
+        size,
+    ):
+        return None
+    return entry["source"]
+
+
+def _write_index(path, mtime, size, source):
+    index_path = _index_path(path)
+    if index_path is None:
+        return
+    try:
+        os.makedirs(os.path.dirname(index_path), exist_ok=True)
+        # write and rename, so other kernels never read a partial file
+        tmp_path = index_path + f".{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"path": path, "mtime": mtime, "size": size, "source": source}, f)
+        os.replace(tmp_path, index_path)
+    except OSError as e:
+        log.warning(f"could not write source cache: {e}")
+
+
+def read_source(path):
+    """Returns the content of the file at path, from the cache when it is still
+    valid."""
+    path = os.path.abspath(path)
+    now = time.monotonic()
+    with _lock:
+        entry = _entries.get(path)
+    if entry is not None and now - entry["checked"] < validate_interval:
+        return entry["source"]
+
+    stat = os.stat(path)
+    mtime, size = stat.st_mtime_ns, stat.st_size
+    if entry is not None and (entry["mtime"], entry["size"]) == (mtime, size):
+        entry["checked"] = now
+        return entry["source"]
+
+    source = _read_index(path, mtime, size)
+    if source is None:
+        with open(path, encoding="utf-8") as f:
+            source = f.read()
+        _write_index(path, mtime, size, source)
+    with _lock:
+        _entries[path] = {
+            "mtime": mtime,
+            "size": size,
+            "source": source,
+            "checked": now,
+        }
+    return source
+
+
+def invalidate(path=None):
+    """Forgets the cached source of path, or of all files."""
+    with _lock:
+        if path is None:
+            _entries.clear()
+        else:
+            _entries.pop(os.path.abspath(path), None)
+
+
+__all__ = ["read_source", "invalidate"]
@@ -1,64 +1,177 @@
 import os
-from traitlets import Unicode
+from traitlets import Bool, Dict, Unicode, observe, validate
 from ipywidgets import Widget
 
-from .VueComponentRegistry import vue_component_files, register_component_from_file
+from .VueComponentRegistry import (
+    vue_component_files,
+    vue_component_registry,
+    register_component_from_file,
+)
+from .Precompile import precompile
+from .Batch import BatchedSync, batch
+from .SourceCache import invalidate as invalidate_source, read_source
 from ._version import semver
 
 template_registry = {}
 
 
-def watch(paths=""):
+# the files watched by a watch(registered_only=True) observer, and that observer
+_registered_watch = {"observer": None, "handler": None, "directories": set()}
+
+
+def _push_file(path, log):
+    invalidate_source(path)
+    content = read_source(path)
+    if path in template_registry:
+        if template_registry[path].template != content:
+            log.info(f"updating: {path}")
+            template_registry[path].template = content
+    elif path in vue_component_files:
+        name = vue_component_files[path]
+        component = vue_component_registry[name]
+        if component.component != content:
+            log.info(f"updating component: {path}")
+            register_component_from_file(
+                name, path, precompile=component.compiled is not None
+            )
+
+
+def _watch_registered_directory(path):
+    directory = os.path.dirname(path)
+    observer = _registered_watch["observer"]
+    if observer is None or directory in _registered_watch["directories"]:
+        return
+    _registered_watch["directories"].add(directory)
+    observer.schedule(_registered_watch["handler"], directory, recursive=False)
+
+
+def watch(paths="", debounce=0.1, registered_only=False):
+    """Updates templates and components when their files change.
+
+    Editors often write a file several times per save, so a file is reloaded once
+    it did not change for ``debounce`` seconds, with its updates sent in a single
+    batch. Files of which the content did not change are not pushed.
+
+    With ``registered_only``, only the directories of the files loaded with
+    ``template_file`` or ``register_component_from_file`` are watched (not
+    recursively), instead of the directory trees in ``paths``.
+    """
     import logging
+    import threading
     from watchdog.observers import Observer
     from watchdog.events import FileSystemEventHandler
 
     log = logging.getLogger("ipyvue")
+    # path -> the timer of its pending reload, each file settles on its own
+    timers = {}
+    lock = threading.Lock()
+
+    def flush(path, timer):
+        with lock:
+            if timers.get(path) is not timer:
+                return
+            del timers[path]
+        with batch():
+            try:
+                _push_file(path, log)
+            except OSError as e:
+                log.warning(f"could not read {path}: {e}")
+
+    def schedule(path):
+        path = os.path.normpath(os.path.abspath(path))
+        if path not in template_registry and path not in vue_component_files:
+            return
+        with lock:
+            if path in timers:
+                timers[path].cancel()
+            timer = threading.Timer(debounce, lambda: flush(path, timer))
+            timer.daemon = True
+            timers[path] = timer
+            timer.start()
 
     class VueEventHandler(FileSystemEventHandler):
         def on_modified(self, event):
             super(VueEventHandler, self).on_modified(event)
             if not event.is_directory:
-                if event.src_path in template_registry:
-                    log.info(f"updating: {event.src_path}")
-                    with open(event.src_path) as f:
-                        template_registry[event.src_path].template = f.read()
-                elif event.src_path in vue_component_files:
-                    log.info(f"updating component: {event.src_path}")
-                    name = vue_component_files[event.src_path]
-                    register_component_from_file(name, event.src_path)
+                schedule(event.src_path)
+
+        def on_created(self, event):
+            super(VueEventHandler, self).on_created(event)
+            if not event.is_directory:
+                schedule(event.src_path)
+
+        def on_moved(self, event):
+            # editors that save by writing a temporary file and renaming it
+            super(VueEventHandler, self).on_moved(event)
+            if not event.is_directory:
+                schedule(event.dest_path)
 
     observer = Observer()
 
-    if not isinstance(paths, (list, tuple)):
-        paths = [paths]
+    if registered_only:
+        _registered_watch.update(
+            observer=observer, handler=VueEventHandler(), directories=set()
+        )
+        for path in [*template_registry, *vue_component_files]:
+            _watch_registered_directory(path)
+    else:
+        if not isinstance(paths, (list, tuple)):
+            paths = [paths]
 
-    for path in paths:
-        path = os.path.normpath(path)
-        log.info(f"watching {path}")
-        observer.schedule(VueEventHandler(), path, recursive=True)
+        for path in paths:
+            path = os.path.normpath(path)
+            log.info(f"watching {path}")
+            observer.schedule(VueEventHandler(), path, recursive=True)
 
     observer.start()
+    return observer
 
 
-def get_template(abs_path):
+def get_template(abs_path, precompile=False):
     abs_path = os.path.normpath(abs_path)
     if abs_path not in template_registry:
-        with open(abs_path, encoding="utf-8") as f:
-            tw = Template(template=f.read())
-            template_registry[abs_path] = tw
+        tw = Template(template=read_source(abs_path), precompile=precompile)
+        template_registry[abs_path] = tw
+        _watch_registered_directory(abs_path)
     else:
-        with open(abs_path, encoding="utf-8") as f:
-            template_registry[abs_path].template = f.read()
+        if precompile:
+            template_registry[abs_path].precompile = True
+        content = read_source(abs_path)
+        # unchanged templates are not sent again
+        if template_registry[abs_path].template != content:
+            template_registry[abs_path].template = content
     return template_registry[abs_path]
 
 
-class Template(Widget):
+class Template(BatchedSync, Widget):
     _model_name = Unicode("TemplateModel").tag(sync=True)
     _model_module = Unicode("jupyter-vue").tag(sync=True)
     _model_module_version = Unicode(semver).tag(sync=True)
 
     template = Unicode(None, allow_none=True).tag(sync=True)
 
+    # render functions compiled from template in the kernel (see Precompile.py),
+    # so the frontend does not have to compile the template
+    compiled = Dict(None, allow_none=True).tag(sync=True)
+
+    precompile = Bool(False)
+
+    @validate("template")
+    def _validate_template(self, proposal):
+        # set before the template itself, so the frontend never combines a new
+        # template with old render functions
+        self._update_compiled(proposal["value"])
+        return proposal["value"]
+
+    @observe("precompile")
+    def _precompile_changed(self, change):
+        self._update_compiled(self.template)
+
+    def _update_compiled(self, template):
+        if self.precompile and template:
+            self.compiled = precompile(template)
+        else:
+            self.compiled = None
+
 
 __all__ = ["Template", "watch"]
@@ -0,0 +1,103 @@
+from traitlets import Any, Dict, Int, Unicode, observe, validate
+from ipywidgets import Widget
+from ipywidgets.widgets.widget import widget_serialization
+
+from .VueWidget import VueWidget
+
+
+class VirtualScroll(VueWidget):
+    """A scrollable list of children of which only the ones in view are rendered.
+
+    Children are rendered as rows of ``item_height`` pixels. Only the rows in view,
+    plus ``overscan`` rows above and below, have a view in the browser; views of
+    rows that are scrolled out of the window are removed.
+
+    In lazy mode, enabled by setting ``length`` and ``item_factory`` instead of
+    ``children``, rows are only created when the browser requests them.
+    ``item_factory(start, stop)`` should return the widgets (or strings) for the
+    rows ``start`` to ``stop``. Widgets of rows further than ``evict_distance``
+    rows away from the requested rows are closed.
+    """
+
+    _model_name = Unicode("VirtualScrollModel").tag(sync=True)
+
+    item_height = Int(48).tag(sync=True)
+
+    height = Unicode("400px").tag(sync=True)
+
+    overscan = Int(5).tag(sync=True)
+
+    length = Int(None, allow_none=True).tag(sync=True)
+
+    item_factory = Any(None, allow_none=True)
+
+    evict_distance = Int(500)
+
+    # the materialized rows in lazy mode, by index
+    _lazy_children = Dict().tag(sync=True, **widget_serialization)
+
+    @validate("length")
+    def _validate_length(self, proposal):
+        if proposal["value"] is not None and proposal["value"] < 0:
+            raise ValueError("length should not be negative")
+        return proposal["value"]
+
+    @observe("item_factory")
+    def _item_factory_changed(self, change):
+        self._evict(lambda index: True)
+
+    @observe("length")
+    def _length_changed(self, change):
+        length = change["new"] or 0
+        self._evict(lambda index: index >= length)
+
+    def _evict(self, predicate, children=None):
+        update = children is None
+        children = dict(self._lazy_children) if update else children
+        for key in [key for key in children if predicate(int(key))]:
+            child = children.pop(key)
+            if isinstance(child, Widget):
+                child.close()
+        if update:
+            self._lazy_children = children
+
+    def _request_range(self, start, stop):
+        if self.length is None or self.item_factory is None:
+            return
+        start, stop = max(0, start), min(self.length, stop)
+        children = dict(self._lazy_children)
+
+        self._evict(
+            lambda index: index < start - self.evict_distance
+            or index >= stop + self.evict_distance,
+            children,
+        )
+
+        index = start
+        while index < stop:
+            if str(index) in children:
+                index += 1
+                continue
+            run_stop = index + 1
+            while run_stop < stop and str(run_stop) not in children:
+                run_stop += 1
+            items = self.item_factory(index, run_stop)
+            children.update(
+                (str(i), item) for i, item in zip(range(index, run_stop), items)
+            )
+            index = run_stop
+
+        self._lazy_children = children
+
+    def _handle_event(self, _, content, buffers):
+        if "request_range" in content:
+            self._request_range(*content["request_range"])
+        else:
+            super()._handle_event(_, content, buffers)
+
+    def close(self):
+        self._evict(lambda index: True)
+        super().close()
+
+
+__all__ = ["VirtualScroll"]
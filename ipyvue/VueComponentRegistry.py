@@ -1,13 +1,16 @@
 import os
-from traitlets import Unicode
+from traitlets import Dict, Unicode
 from ipywidgets import DOMWidget
 from ipywidgets.widgets.widget import widget_serialization
 from ipywidgets.widgets.widget_layout import Layout
 from ipywidgets.widgets.trait_types import InstanceDict
+from .Precompile import precompile as precompile_source
+from .Batch import BatchedSync
+from .SourceCache import read_source
 from ._version import semver
 
 
-class VueComponent(DOMWidget):
+class VueComponent(BatchedSync, DOMWidget):
     # model-only widget (a registry entry): an explicit layout costs a full
     # Layout widget (comm_open + close) per registered component, per kernel.
     # we can drop this when https://github.com/jupyter-widgets/ipywidgets/pull/3592
@@ -22,24 +25,31 @@ class VueComponent(DOMWidget):
 
     name = Unicode().tag(sync=True)
     component = Unicode().tag(sync=True)
+    # render functions compiled in the kernel, see Precompile.py
+    compiled = Dict(None, allow_none=True).tag(sync=True)
 
 
 vue_component_registry = {}
 vue_component_files = {}
 
 
-def register_component_from_string(name, value):
+def register_component_from_string(name, value, compiled=None):
     components = vue_component_registry
 
     if name in components.keys():
         comp = components[name]
+        # before the component itself, so the frontend never combines a new
+        # component with old render functions
+        comp.compiled = compiled
         comp.component = value
     else:
-        comp = VueComponent(name=name, component=value)
+        comp = VueComponent(name=name, component=value, compiled=compiled)
         components[name] = comp
 
 
-def register_component_from_file(name, file_name, relative_to_file=None):
+def register_component_from_file(
+    name, file_name, relative_to_file=None, precompile=False
+):
     # for backward compatibility with previous argument arrangement
     if name is None:
         name = file_name
@@ -48,9 +58,14 @@ def register_component_from_file(name, file_name, relative_to_file=None):
 
     if relative_to_file:
         file_name = os.path.join(os.path.dirname(relative_to_file), file_name)
-    with open(file_name) as f:
-        vue_component_files[os.path.abspath(file_name)] = name
-        register_component_from_string(name, f.read())
+    source = read_source(file_name)
+    vue_component_files[os.path.abspath(file_name)] = name
+    compiled = precompile_source(source) if precompile else None
+    register_component_from_string(name, source, compiled)
+
+    from .Template import _watch_registered_directory
+
+    _watch_registered_directory(os.path.abspath(file_name))
 
 
 __all__ = [
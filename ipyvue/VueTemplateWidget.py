@@ -1,15 +1,34 @@
+import copy
 import os
-from traitlets import Any, Bool, Unicode, List, Dict, Union, Instance, default
+from functools import reduce
+from operator import getitem
+from traitlets import (
+    Any,
+    Bool,
+    Enum,
+    Int,
+    Unicode,
+    List,
+    Dict,
+    Union,
+    Instance,
+    default,
+    observe,
+)
 from ipywidgets import DOMWidget
 from ipywidgets.widgets.widget import widget_serialization
 from ipywidgets.widgets.widget_layout import Layout
 from ipywidgets.widgets.trait_types import InstanceDict
 
 from .Template import Template, get_template
+from .JsonPatch import make_patch, apply_patch
+from .Batch import BatchedSync, batching
+from .CompactState import CompactState, defaults_trait
+from .Handlers import SYNC_POLICIES, cancel_handlers, run_handler
+from .Rpc import handle_rpc, rpc_methods
 from ._version import semver
 from .ForceLoad import force_load_instance
 import inspect
-from importlib import import_module
 import ipyvue
 
 OBJECT_REF = "objectRef"
@@ -20,47 +39,49 @@ class Events(object):
     def __init__(self, **kwargs):
         self.on_msg(self._handle_event)
         self.events = [item[4:] for item in dir(self) if item.startswith("vue_")]
+        # event -> running tasks of async vue_ methods
+        self._handler_tasks = {}
+
+    def _resolve_ref(self, value):
+        if isinstance(value, dict):
+            if OBJECT_REF in value.keys():
+                # paths are short, walking them is cheaper than looking up a
+                # resolver cached per path
+                return reduce(
+                    getitem, value.get("path", []), getattr(self, value[OBJECT_REF])
+                )
+            if FUNCTION_REF in value.keys():
+                fn = getattr(self, value[FUNCTION_REF])
+                args = value.get("args", [])
+                kwargs = value.get("kwargs", {})
+                return fn(*args, **kwargs)
+        return value
 
     def _handle_event(self, _, content, buffers):
-        def resolve_ref(value):
-            if isinstance(value, dict):
-                if OBJECT_REF in value.keys():
-                    obj = getattr(self, value[OBJECT_REF])
-                    for path_item in value.get("path", []):
-                        obj = obj[path_item]
-                    return obj
-                if FUNCTION_REF in value.keys():
-                    fn = getattr(self, value[FUNCTION_REF])
-                    args = value.get("args", [])
-                    kwargs = value.get("kwargs", {})
-                    return fn(*args, **kwargs)
-            return value
-
-        if "create_widget" in content.keys():
-            module_name = content["create_widget"][0]
-            class_name = content["create_widget"][1]
-            props = {k: resolve_ref(v) for k, v in content["props"].items()}
-            module = import_module(module_name)
-            widget = getattr(module, class_name)(**props, model_id=content["id"])
-            self._component_instances = [*self._component_instances, widget]
+        if "create_widgets" in content.keys() or "destroy_widgets" in content.keys():
+            self._update_component_instances(
+                content.get("create_widgets", []), content.get("destroy_widgets", [])
+            )
+        elif "create_widget" in content.keys():
+            self._update_component_instances([content], [])
         elif "update_ref" in content.keys():
-            widget = DOMWidget.widgets[content["id"]]
+            widget = self._component_instances[content["id"]]
             prop = content["prop"]
-            obj = resolve_ref(content["update_ref"])
+            obj = self._resolve_ref(content["update_ref"])
             setattr(widget, prop, obj)
         elif "destroy_widget" in content.keys():
-            self._component_instances = [
-                w
-                for w in self._component_instances
-                if w.model_id != content["destroy_widget"]
-            ]
+            self._update_component_instances([], [content["destroy_widget"]])
+        elif "patch" in content.keys():
+            self._apply_patches(content["patch"])
+        elif "rpc" in content.keys():
+            handle_rpc(self, content, buffers)
         elif "event" in content.keys():
             event = content.get("event", "")
             data = content.get("data", {})
-            if buffers:
-                getattr(self, "vue_" + event)(data, buffers)
-            else:
-                getattr(self, "vue_" + event)(data)
+            method = getattr(self, "vue_" + event)
+            result = method(data, buffers) if buffers else method(data)
+            cancel_running = getattr(method, "_ipyvue_cancel_running", False)
+            run_handler(self, event, result, cancel_running)
 
     def _clear_event_handler(self):
         self.on_msg(self._handle_event, remove=True)
@@ -78,22 +99,81 @@ def _class_to_json(x, obj):
     return {k: _value_to_json(v, obj) for k, v in x.items()}
 
 
-def as_refs(name, data):
-    def to_ref_structure(obj, path):
+_NO_VALUE = object()
+
+
+def _path_to_list(path):
+    # paths are built as (parent, key) pairs, so a node does not copy its parent path
+    keys = []
+    while path is not None:
+        path, key = path
+        keys.append(key)
+    keys.reverse()
+    return keys
+
+
+def _same_shape(obj, ref):
+    # a container changed in place still is the previous object, but its refs only
+    # fit while it has the same items
+    if isinstance(obj, list):
+        return isinstance(ref, list) and len(ref) == len(obj)
+    if isinstance(obj, dict):
+        return isinstance(ref, dict) and ref.keys() == obj.keys()
+    return True
+
+
+def as_refs(name, data, previous_data=_NO_VALUE, previous_refs=None):
+    """Returns the structure of data with the leaves replaced by references.
+
+    When the refs of a previous value are given, subtrees that are the same object
+    at the same place as in the previous value reuse the previous refs, so the work
+    is proportional to the part of data that was replaced.
+
+    Since subtrees are compared by identity, the source should be updated by
+    replacing the containers on the path to a change, not by changing them in
+    place. A reused list or dict that changed length or keys in place is rebuilt
+    (its own items are still compared by identity), but deeper changes made in
+    place are not seen and leave the refs of that subtree stale.
+    """
+
+    def to_ref_structure(obj, path, previous, previous_ref):
+        if obj is previous and _same_shape(obj, previous_ref):
+            return previous_ref
         if isinstance(obj, list):
+            reuse = isinstance(previous, list) and isinstance(previous_ref, list)
+            known = min(len(previous), len(previous_ref)) if reuse else 0
             return [
-                to_ref_structure(item, [*path, index]) for index, item in enumerate(obj)
+                to_ref_structure(
+                    item,
+                    (path, index),
+                    previous[index] if index < known else _NO_VALUE,
+                    previous_ref[index] if index < known else None,
+                )
+                for index, item in enumerate(obj)
             ]
         if isinstance(obj, dict):
-            return {k: to_ref_structure(v, [*path, k]) for k, v in obj.items()}
+            reuse = isinstance(previous, dict) and isinstance(previous_ref, dict)
+            return {
+                k: to_ref_structure(
+                    v,
+                    (path, k),
+                    previous.get(k, _NO_VALUE)
+                    if reuse and k in previous_ref
+                    else _NO_VALUE,
+                    previous_ref.get(k) if reuse else None,
+                )
+                for k, v in obj.items()
+            }
 
         # add object id to detect a new object in the same structure
-        return {OBJECT_REF: name, "path": path, "id": id(obj)}
+        return {OBJECT_REF: name, "path": _path_to_list(path), "id": id(obj)}
 
-    return to_ref_structure(data, [])
+    if previous_refs is None:
+        previous_data = _NO_VALUE
+    return to_ref_structure(data, None, previous_data, previous_refs)
 
 
-class VueTemplate(DOMWidget, Events):
+class VueTemplate(CompactState, BatchedSync, DOMWidget, Events):
     # like VueWidget: an explicit layout costs a full Layout widget (comm_open
     # + close) per template widget; None means "no layout" on the vue side.
     # we can drop this when https://github.com/jupyter-widgets/ipywidgets/pull/3592
@@ -115,6 +195,10 @@ class VueTemplate(DOMWidget, Events):
 
     _model_name = Unicode("VueTemplateModel").tag(sync=True)
 
+    # the class defaults of traits left out of the state when ipyvue.compact_state
+    # is set
+    _defaults = defaults_trait()
+
     _view_name = Unicode("VueView").tag(sync=True)
 
     _view_module = Unicode("jupyter-vue").tag(sync=True)
@@ -145,14 +229,94 @@ class VueTemplate(DOMWidget, Events):
 
     events = List(Unicode(), allow_none=True).tag(sync=True)
 
+    # the number of calls in progress of vue_ methods decorated with ipyvue.offload,
+    # by event, available in the template as $inFlight
+    _in_flight = Dict().tag(sync=True)
+
+    # the methods decorated with ipyvue.rpc and their options
+    _rpc_methods = Dict().tag(sync=True)
+
+    @default("_rpc_methods")
+    def _default_rpc_methods(self):
+        return rpc_methods(type(self))
+
+    # the options of vue_ methods decorated with ipyvue.event_handler, by event
+    _event_options = Dict().tag(sync=True)
+
+    @default("_event_options")
+    def _default_event_options(self):
+        options = {}
+        for event in self.events or []:
+            method = getattr(type(self), "vue_" + event, None)
+            event_options = getattr(method, "_ipyvue_event_options", None)
+            if event_options:
+                options[event] = event_options
+        return options
+
     components = Dict(default_value=None, allow_none=True).tag(
         sync=True, **class_component_serialization
     )
 
-    _component_instances = List().tag(sync=True, **widget_serialization)
+    # instances of class components by the id of their Vue component, changes are
+    # sent as patches
+    _component_instances = Dict().tag(sync=True, patch=True, **widget_serialization)
+
+    # traits tagged with patch=True (or patch=<resync interval>) are synced as
+    # json patches, maps trait name to the number of patches between full syncs
+    _patch_traits = Dict().tag(sync=True)
+
+    @default("_patch_traits")
+    def _default_patch_traits(self):
+        patch_traits = {
+            name: self.patch_resync_interval if interval is True else interval
+            for name, interval in self._tagged_traits("patch").items()
+        }
+        # the refs of sync_ref traits change only where their source changed
+        for name in self._sync_ref_traits():
+            patch_traits[name + "_ref"] = self.patch_resync_interval
+        return patch_traits
+
+    # how changes made in the frontend are sent to the kernel: immediately, or
+    # coalesced per tick, per animation frame, debounced or throttled (with
+    # sync_wait in ms). Traits can override this with the sync_policy and
+    # sync_wait tags.
+    sync_policy = Enum(SYNC_POLICIES, "immediate")
+
+    sync_wait = Int(100)
+
+    _sync_policies = Dict().tag(sync=True)
+
+    @default("_sync_policies")
+    def _default_sync_policies(self):
+        policies = {"*": {"policy": self.sync_policy, "wait": self.sync_wait}}
+        for name, policy in self._tagged_traits("sync_policy").items():
+            if policy not in SYNC_POLICIES:
+                raise ValueError(
+                    f"Unknown sync_policy {policy!r} for trait {name!r}, "
+                    f"use one of {SYNC_POLICIES}"
+                )
+            wait = self.trait_metadata(name, "sync_wait", self.sync_wait)
+            policies[name] = {"policy": policy, "wait": wait}
+        return policies
+
+    @observe("sync_policy", "sync_wait")
+    def _sync_policy_changed(self, change):
+        self._sync_policies = self._default_sync_policies()
 
     template_file = None
 
+    # compile template_file to render functions in the kernel (needs node and
+    # vue-template-compiler), see Precompile.py
+    precompile = False
+
+    patch_resync_interval = 100
+
+    # the number of destroyed class component instances to keep per class, to be
+    # reused for new Vue component instances. Traits that are not passed as props
+    # keep the value they had in the previous instance. Pooled widgets are closed
+    # with the template, other destroyed instances are left open.
+    component_pool_size = 0
+
     def __init__(self, *args, **kwargs):
         if self.template_file:
             abs_path = ""
@@ -162,31 +326,185 @@ class VueTemplate(DOMWidget, Events):
                 rel_file, path = self.template_file
                 abs_path = os.path.join(os.path.dirname(rel_file), path)
 
-            self.template = get_template(abs_path)
+            self.template = get_template(abs_path, self.precompile)
 
         super().__init__(*args, **kwargs)
 
-        sync_ref_traitlets = [
-            v for k, v in self.traits().items() if "sync_ref" in v.metadata.keys()
-        ]
-
         def create_ref_and_observe(traitlet):
             data = traitlet.get(self)
             ref_name = traitlet.name + "_ref"
             self.add_traits(
-                **{ref_name: Any(as_refs(traitlet.name, data)).tag(sync=True)}
+                **{
+                    ref_name: Any(as_refs(traitlet.name, data)).tag(
+                        sync=True, immutable=True
+                    )
+                }
             )
 
             def on_ref_source_change(change):
-                setattr(self, ref_name, as_refs(traitlet.name, change["new"]))
+                refs = as_refs(
+                    traitlet.name, change["new"], change["old"], getattr(self, ref_name)
+                )
+                setattr(self, ref_name, refs)
 
             self.observe(on_ref_source_change, traitlet.name)
 
-        for traitlet in sync_ref_traitlets:
+        for traitlet in self._sync_ref_traits().values():
             create_ref_and_observe(traitlet)
 
+    def _sync_ref_traits(self):
+        # the source traits are usually not synced themselves
+        return {
+            name: trait
+            for name, trait in self.traits().items()
+            if "sync_ref" in trait.metadata
+        }
+
+    def _tagged_traits(self, tag):
+        return {
+            name: trait.metadata[tag]
+            for name, trait in self.traits(sync=True).items()
+            if trait.metadata.get(tag)
+        }
+
+    def _patch_json(self, key, value):
+        to_json = self.trait_metadata(key, "to_json", self._trait_to_json)
+        return to_json(value, self)
+
+    def _reset_patch_shadows(self, keys):
+        # the shadow is our copy of the value as last known by the frontend
+        if not hasattr(self, "_patch_shadows"):
+            self._patch_shadows = {}
+            self._patch_counts = {}
+        for key in keys:
+            if key in self._patch_traits:
+                value = self._patch_json(key, getattr(self, key))
+                self._patch_shadows[key] = self._copy_shadow(key, value)
+                self._patch_counts[key] = 0
+
+    def _copy_shadow(self, key, value):
+        # values of immutable traits are replaced, never modified in place, so the
+        # shadow can share them, which lets make_patch skip unchanged subtrees
+        if self.trait_metadata(key, "immutable"):
+            return value
+        return copy.deepcopy(value)
+
+    def open(self):
+        super().open()
+        self._reset_patch_shadows(self.keys)
+
+    def _state_sent(self, keys):
+        self._reset_patch_shadows(keys)
+
+    def set_state(self, sync_data):
+        for key, value in sync_data.items():
+            if key in getattr(self, "_patch_shadows", {}):
+                self._patch_shadows[key] = copy.deepcopy(value)
+                self._patch_counts[key] = 0
+        super().set_state(sync_data)
+
+    def _should_send_property(self, key, value):
+        if not super()._should_send_property(key, value):
+            return False
+        # batch() and hold_sync() send full values, a patch sent in between would
+        # arrive before the state it applies to
+        if key not in getattr(self, "_patch_shadows", {}) or batching():
+            return True
+        if self._holding_sync:
+            self._states_to_send.add(key)
+            return False
+        shadow = self._patch_shadows[key]
+        new_json = self._patch_json(key, value)
+        ops = make_patch(shadow, new_json)
+        if not ops:
+            return False
+        self._patch_counts[key] += 1
+        if self._patch_counts[key] >= self._patch_traits[key]:
+            return True
+        # when most of the value changed, a full sync is cheaper
+        if isinstance(shadow, (list, dict)) and len(ops) > max(1, len(shadow) // 2):
+            return True
+        self.send({"patch": {key: ops}})
+        if self.trait_metadata(key, "immutable"):
+            self._patch_shadows[key] = new_json
+        else:
+            self._patch_shadows[key] = apply_patch(shadow, ops, copy_values=True)
+        return False
+
+    def _apply_patches(self, patches):
+        for key, ops in patches.items():
+            if key not in getattr(self, "_patch_shadows", {}):
+                continue
+            shadow = apply_patch(self._patch_shadows[key], ops)
+            self._patch_shadows[key] = shadow
+            from_json = self.trait_metadata(key, "from_json")
+            if from_json is None:
+                value = apply_patch(getattr(self, key), ops, copy_values=True)
+            else:
+                value = from_json(copy.deepcopy(shadow), self)
+            # the shadow is already up to date, so this will not be echoed back
+            self.set_trait(key, value)
+
+    @observe("components")
+    def _components_changed(self, change):
+        self._component_classes = None
+
+    def _component_class(self, module_name, class_name):
+        # only the class components of this template can be created by the frontend
+        if getattr(self, "_component_classes", None) is None:
+            self._component_classes = {
+                (value.__module__, value.__name__): value
+                for value in (self.components or {}).values()
+                if inspect.isclass(value)
+            }
+        try:
+            return self._component_classes[(module_name, class_name)]
+        except KeyError:
+            raise ValueError(
+                f"{module_name}.{class_name} is not a class component of {self!r}"
+            ) from None
+
+    def _update_component_instances(self, creates, destroys):
+        classes = [
+            self._component_class(*create["create_widget"]) for create in creates
+        ]
+
+        # destroys first, so the widgets can be reused by the creates
+        instances = dict(self._component_instances)
+        if not hasattr(self, "_component_pools"):
+            self._component_pools = {}
+        pools = self._component_pools
+        for component_id in destroys:
+            widget = instances.pop(component_id, None)
+            if widget is None:
+                continue
+            # widgets that aren't pooled are left open, the application may still
+            # hold and reuse them
+            pool = pools.setdefault(type(widget), [])
+            if len(pool) < self.component_pool_size:
+                pool.append(widget)
+
+        for cls, create in zip(classes, creates):
+            props = {k: self._resolve_ref(v) for k, v in create["props"].items()}
+            pool = pools.get(cls)
+            if pool:
+                widget = pool.pop()
+                with widget.hold_sync():
+                    for name, value in props.items():
+                        setattr(widget, name, value)
+            else:
+                widget = cls(**props)
+            instances[create["id"]] = widget
+
+        self._component_instances = instances
+
     def close(self):
+        for pool in getattr(self, "_component_pools", {}).values():
+            for widget in pool:
+                widget.close()
+
         self._clear_event_handler()
+        cancel_handlers(self)
         super().close()
 
 
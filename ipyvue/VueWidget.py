@@ -6,6 +6,10 @@ from ipywidgets.widgets.trait_types import InstanceDict
 
 from ._version import semver
 from .ForceLoad import force_load_instance
+from .Batch import BatchedSync
+from .Element import Element, element_serialization
+from .CompactState import CompactState, defaults_trait
+from .Handlers import cancel_handlers, event_options, run_handler
 
 
 class ClassList:
@@ -74,42 +78,98 @@ class ClassList:
 
 class Events(object):
     def __init__(self, **kwargs):
+        # event_and_modifiers -> CallbackDispatcher
         self._event_handlers_map = {}
+        # event name without modifiers -> event_and_modifiers, there can be only one
+        # registration per event
+        self._event_index = {}
+        # event_and_modifiers -> options sent to the frontend
+        self._event_options_map = {}
+        # event_and_modifiers of async handlers that cancel their running call
+        self._event_cancel_running = set()
+        # event_and_modifiers -> running tasks of async handlers
+        self._handler_tasks = {}
         self.on_msg(self._handle_event)
 
-    def on_event(self, event_and_modifiers, callback, remove=False):
-        new_event = event_and_modifiers.split(".")[0]
-        for existing_event in [
-            event
-            for event in self._event_handlers_map.keys()
-            if event == new_event or event.startswith(new_event + ".")
-        ]:
-            del self._event_handlers_map[existing_event]
-
-        self._event_handlers_map[event_and_modifiers] = CallbackDispatcher()
-
-        self._event_handlers_map[event_and_modifiers].register_callback(
-            callback, remove=remove
+    def on_event(
+        self,
+        event_and_modifiers,
+        callback,
+        remove=False,
+        fields=None,
+        policy="immediate",
+        wait=100,
+        cancel_running=False,
+    ):
+        """Registers (or removes) the callback for an event.
+
+        The callback can be an ``async def`` function, which runs in a task on
+        the event loop of the kernel, so it doesn't block other widgets.
+
+        :param fields: the fields of the event to send, e.g. ``["clientX",
+            "target.value"]``. By default, all fields up to two levels deep are
+            sent, which is a lot for events like mousemove.
+        :param policy: how the browser limits the rate of events: ``immediate``, or
+            send only the latest event per ``tick``, per animation frame
+            (``raf``), when no event happened for ``wait`` ms (``debounce``) or at
+            most once every ``wait`` ms (``throttle``).
+        :param wait: in ms, for the debounce and throttle policies.
+        :param cancel_running: for async callbacks, cancel a still running call
+            when a new event comes in, so only the latest event is handled.
+        """
+        options = event_options(fields, policy, wait)
+        self._register_event(
+            event_and_modifiers, callback, remove, options, cancel_running
         )
-
-        if remove and not self._event_handlers_map[event_and_modifiers].callbacks:
-            del self._event_handlers_map[event_and_modifiers]
-
-        difference = set(self._event_handlers_map.keys()) ^ set(self._events)
-        if len(difference) != 0:
-            self._events = list(self._event_handlers_map.keys())
+        self._sync_events()
+
+    def on_events(self, handlers, remove=False):
+        """Registers (or removes) the callbacks of a dict mapping event_and_modifiers
+        to callbacks, and updates the frontend once."""
+        for event_and_modifiers, callback in handlers.items():
+            self._register_event(event_and_modifiers, callback, remove)
+        self._sync_events()
+
+    def _register_event(
+        self, event_and_modifiers, callback, remove, options=None, cancel_running=False
+    ):
+        event = event_and_modifiers.split(".")[0]
+        existing = self._event_index.pop(event, None)
+        if existing is not None:
+            del self._event_handlers_map[existing]
+            self._event_options_map.pop(existing, None)
+            self._event_cancel_running.discard(existing)
+
+        if remove:
+            return
+
+        dispatcher = CallbackDispatcher()
+        dispatcher.register_callback(callback)
+        self._event_handlers_map[event_and_modifiers] = dispatcher
+        self._event_index[event] = event_and_modifiers
+        if options:
+            self._event_options_map[event_and_modifiers] = options
+        if cancel_running:
+            self._event_cancel_running.add(event_and_modifiers)
+
+    def _sync_events(self):
+        with self.hold_sync():
+            if self._event_handlers_map.keys() != set(self._events):
+                self._events = list(self._event_handlers_map.keys())
+            if self._event_options_map != self._event_options:
+                self._event_options = dict(self._event_options_map)
 
     def fire_event(self, event, data=None):
         """Manually trigger an event handler on the Python side."""
         # note that a click event will trigger click.stop if that particular
         # event+modifier is registered.
-        event_match = [
-            k for k in self._event_handlers_map.keys() if k.startswith(event)
-        ]
-        if not event_match:
-            raise ValueError(f"'{event}' not found in widget {self}")
+        if event not in self._event_handlers_map:
+            event_and_modifiers = self._event_index.get(event.split(".")[0])
+            if event_and_modifiers is None or not event_and_modifiers.startswith(event):
+                raise ValueError(f"'{event}' not found in widget {self}")
+            event = event_and_modifiers
 
-        self._fire_event(event_match[0], data)
+        self._fire_event(event, data)
 
     def click(self, data=None):
         """Manually triggers the event handler for the 'click' event
@@ -121,9 +181,10 @@ class Events(object):
 
     def _fire_event(self, event, data=None):
         dispatcher = self._event_handlers_map[event]
+        cancel_running = event in self._event_cancel_running
         # we don't call via the dispatcher, since that eats exceptions
         for callback in dispatcher.callbacks:
-            callback(self, event, data)
+            run_handler(self, event, callback(self, event, data), cancel_running)
 
     def _handle_event(self, _, content, buffers):
         event = content.get("event", "")
@@ -134,7 +195,7 @@ class Events(object):
         self.on_msg(self._handle_event, remove=True)
 
 
-class VueWidget(DOMWidget, Events):
+class VueWidget(CompactState, BatchedSync, DOMWidget, Events):
     # we can drop this when https://github.com/jupyter-widgets/ipywidgets/pull/3592
     # is merged
     layout = InstanceDict(Layout, allow_none=True).tag(
@@ -149,6 +210,10 @@ class VueWidget(DOMWidget, Events):
 
     _model_name = Unicode("VueModel").tag(sync=True)
 
+    # the class defaults of traits left out of the state when ipyvue.compact_state
+    # is set
+    _defaults = defaults_trait()
+
     _view_name = Unicode("VueView").tag(sync=True)
 
     _view_module = Unicode("jupyter-vue").tag(sync=True)
@@ -159,14 +224,17 @@ class VueWidget(DOMWidget, Events):
 
     _model_module_version = Unicode(semver).tag(sync=True)
 
-    children = List(Union([Instance(DOMWidget), Unicode()])).tag(
-        sync=True, **widget_serialization
+    children = List(Union([Instance(DOMWidget), Instance(Element), Unicode()])).tag(
+        sync=True, **element_serialization
     )
 
     slot = Unicode(None, allow_none=True).tag(sync=True)
 
     _events = List(Unicode()).tag(sync=True)
 
+    # event_and_modifiers -> the fields to send and the rate limiting policy
+    _event_options = Dict().tag(sync=True)
+
     v_model = Any("!!disabled!!", allow_none=True).tag(sync=True)
 
     style_ = Unicode(None, allow_none=True).tag(sync=True)
@@ -175,7 +243,7 @@ class VueWidget(DOMWidget, Events):
 
     attributes = Dict(None, allow_none=True).tag(sync=True)
 
-    v_slots = List(Dict()).tag(sync=True, **widget_serialization)
+    v_slots = List(Dict()).tag(sync=True, **element_serialization)
 
     v_on = Unicode(None, allow_none=True).tag(sync=True)
 
@@ -197,6 +265,7 @@ class VueWidget(DOMWidget, Events):
 
     def close(self):
         self._clear_event_handler()
+        cancel_handlers(self)
         super().close()
 
 
@@ -4,7 +4,15 @@ from ._version import __version__
 from .Html import Html
 from .Template import Template, watch
 from .VueWidget import VueWidget
+from .Element import Element
 from .VueTemplateWidget import VueTemplate
+from .VirtualScroll import VirtualScroll
+from .Columns import Columns, columns_serialization
+from .Batch import batch
+from .Handlers import event_handler
+from .Offload import offload
+from .Rpc import rpc
+from .Reconcile import h, Reconciler
 from .VueComponentRegistry import (
     VueComponent,
     register_component_from_string,
@@ -27,6 +35,12 @@ def _parse_bool_env(key: str, default: bool = False) -> bool:
 # or changed at runtime: ipyvue.scoped_css_support = True
 scoped_css_support = _parse_bool_env("IPYVUE_SCOPED_CSS_SUPPORT", False)
 
+# Only send traits that differ from their class default when a VueWidget or
+# VueTemplate is created, which saves bandwidth for trees of many small widgets.
+# Can be set via environment variable IPYVUE_COMPACT_STATE=1
+# or changed at runtime: ipyvue.compact_state = True
+compact_state = _parse_bool_env("IPYVUE_COMPACT_STATE", False)
+
 
 def _jupyter_labextension_paths():
     return [
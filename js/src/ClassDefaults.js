@@ -0,0 +1,33 @@
+/* eslint camelcase: off */
+import { WidgetModel } from '@jupyter-widgets/base';
+import _ from 'lodash';
+
+/* The default state of a widget class, see ipyvue/CompactState.py */
+export
+class ClassDefaultsModel extends WidgetModel {
+    defaults() {
+        return {
+            ...super.defaults(),
+            ...{
+                _model_name: 'ClassDefaultsModel',
+                _model_module: 'jupyter-vue',
+                _model_module_version: '^0.0.3',
+                values: null,
+            },
+        };
+    }
+}
+
+ClassDefaultsModel.serializers = {
+    ...WidgetModel.serializers,
+};
+
+/* Sets the traits left out of the initial state (attributes) to their class defaults */
+export function applyClassDefaults(model, attributes) {
+    const classDefaults = model.get('_defaults');
+    if (!classDefaults) {
+        return;
+    }
+    const missing = _.omit(classDefaults.get('values') || {}, Object.keys(attributes || {}));
+    model.set(_.cloneDeep(missing), { silent: true });
+}
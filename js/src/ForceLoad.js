@@ -1,5 +1,9 @@
 /* eslint camelcase: off */
-import { DOMWidgetModel } from '@jupyter-widgets/base';
+import { DOMWidgetModel, put_buffers } from '@jupyter-widgets/base';
+
+/* the batches being chained on their models and being applied, in the order they were received */
+let chainQueue = Promise.resolve();
+let batchQueue = Promise.resolve();
 
 export class ForceLoadModel extends DOMWidgetModel {
     defaults() {
@@ -12,6 +16,56 @@ export class ForceLoadModel extends DOMWidgetModel {
             },
         };
     }
+
+    initialize(attributes, options) {
+        super.initialize(attributes, options);
+        this.on('msg:custom', (content, buffers) => {
+            if (content.batch) {
+                this.applyBatch(content.batch, buffers || []);
+            }
+        });
+    }
+
+    /* Applies the state updates of many models, sent by ipyvue.batch(). Batches are applied in the
+     * order they were received, and each update is chained on the state_change of its model, like a
+     * regular update message, so it can't overtake or be overtaken by other updates. */
+    applyBatch(updates, buffers) {
+        const manager = this.widget_manager;
+        let release;
+        const applied = new Promise((resolve) => { release = resolve; });
+        /* batches are chained on the models one after the other, so a later batch can't chain
+         * before an earlier one */
+        const chained = chainQueue
+            .then(() => Promise.all(updates.map(({ model_id }) => manager.get_model(model_id))))
+            .then((models) => {
+                /* failures of earlier updates are reported by the models themselves */
+                const earlierChanges = models.map(model => model.state_change.catch(() => undefined));
+                /* updates received after the batch wait until it is applied */
+                models.forEach((model) => {
+                    model.state_change = model.state_change.then(() => applied); // eslint-disable-line no-param-reassign
+                });
+                return { models, earlierChanges };
+            });
+        chainQueue = chained.catch(() => undefined);
+
+        const previousBatch = batchQueue;
+        batchQueue = chained
+            .then(({ models, earlierChanges }) => {
+                const states = Promise.all(updates.map(({ state, buffer_paths, buffer_start }, i) => {
+                    put_buffers(state, buffer_paths,
+                        buffers.slice(buffer_start, buffer_start + buffer_paths.length));
+                    return models[i].constructor._deserialize_state(state, manager);
+                }));
+                return Promise.all([previousBatch, states, ...earlierChanges])
+                    .then(([, deserialized]) => {
+                        /* set all states synchronously, so they are rendered in one pass */
+                        deserialized.forEach((state, i) => models[i].set_state(state));
+                    });
+            })
+            .catch(error => console.error('Could not apply batched state updates', error))
+            .finally(release);
+        return batchQueue;
+    }
 }
 
 ForceLoadModel.serializers = {
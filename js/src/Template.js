@@ -2,6 +2,7 @@
 import {
     WidgetModel,
 } from '@jupyter-widgets/base';
+import { removeTemplate, setTemplateSource } from './componentGraph';
 
 export
 class TemplateModel extends WidgetModel {
@@ -10,9 +11,17 @@ class TemplateModel extends WidgetModel {
             ...super.defaults(),
             ...{
                 _model_name: 'TemplateModel',
+                compiled: null,
             },
         };
     }
+
+    initialize(attributes, options) {
+        super.initialize(attributes, options);
+        setTemplateSource(this, this.get('template'));
+        this.on('change:template', () => setTemplateSource(this, this.get('template')));
+        this.once('destroy', () => removeTemplate(this));
+    }
 }
 
 TemplateModel.serializers = {
@@ -0,0 +1,25 @@
+/* eslint camelcase: off */
+import { unpack_models } from '@jupyter-widgets/base';
+import { VueModel } from './VueModel';
+
+export
+class VirtualScrollModel extends VueModel {
+    defaults() {
+        return {
+            ...super.defaults(),
+            ...{
+                _model_name: 'VirtualScrollModel',
+                item_height: 48,
+                height: '400px',
+                overscan: 5,
+                length: null,
+                _lazy_children: null,
+            },
+        };
+    }
+}
+
+VirtualScrollModel.serializers = {
+    ...VueModel.serializers,
+    _lazy_children: { deserialize: unpack_models },
+};
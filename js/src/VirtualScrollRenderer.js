@@ -0,0 +1,134 @@
+import { renderElement, updateCache, vueRender } from './VueRenderer'; // eslint-disable-line import/no-cycle
+
+const LAYOUT_KEYS = [
+    'children', 'item_height', 'height', 'overscan', 'class_', 'style_', 'length', '_lazy_children',
+];
+
+/* Returns the [start, stop) range of rows in or near the viewport */
+export function visibleRange(scrollTop, viewportHeight, itemHeight, overscan, count) {
+    const first = Math.floor(scrollTop / itemHeight);
+    const last = Math.ceil((scrollTop + viewportHeight) / itemHeight);
+    return {
+        start: Math.max(0, first - overscan),
+        stop: Math.min(count, last + overscan),
+    };
+}
+
+export function virtualScrollRender(createElement, model, parentView, slotScopes) {
+    return createElement({
+        data() {
+            return {
+                scrollTop: 0,
+                viewportHeight: 0,
+            };
+        },
+        created() {
+            /* component options of the rendered rows, a new options object would remount the row */
+            this.rowCache = {};
+            LAYOUT_KEYS.forEach(key => model.on(`change:${key}`, this.$forceUpdate, this));
+            /* rows may have been evicted or reset in the kernel, so ask again for missing rows */
+            model.on('change:_lazy_children change:length', () => { this.requestedRange = null; }, this);
+        },
+        mounted() {
+            this.viewportHeight = this.$el.clientHeight;
+            if (window.ResizeObserver) {
+                this.resizeObserver = new ResizeObserver(() => {
+                    this.viewportHeight = this.$el.clientHeight;
+                });
+                this.resizeObserver.observe(this.$el);
+            }
+        },
+        beforeDestroy() {
+            model.off(null, null, this);
+            if (this.resizeObserver) {
+                this.resizeObserver.disconnect();
+            }
+            if (this.frame) {
+                window.cancelAnimationFrame(this.frame);
+            }
+        },
+        methods: {
+            onScroll() {
+                /* at most one render per frame */
+                if (!this.frame) {
+                    this.frame = window.requestAnimationFrame(() => {
+                        this.frame = null;
+                        this.scrollTop = this.$el.scrollTop;
+                    });
+                }
+            },
+            /* in lazy mode, asks the kernel to create the rows in the range that are missing */
+            requestRange(start, stop, lazyChildren) {
+                let missing = false;
+                for (let i = start; i < stop && !missing; ++i) {
+                    missing = !lazyChildren[i];
+                }
+                const range = `${start}:${stop}`;
+                if (missing && range !== this.requestedRange) {
+                    this.requestedRange = range;
+                    model.send({ request_range: [start, stop] });
+                }
+            },
+            renderRow(h, child, index) {
+                if (child === undefined) {
+                    return { key: `pending-${index}`, vnode: null };
+                }
+                if (typeof child === 'string') {
+                    return { key: `text-${index}`, vnode: child };
+                }
+                if (child.element) {
+                    return {
+                        key: `element-${index}`,
+                        vnode: renderElement(h, child.element, this, parentView, slotScopes),
+                    };
+                }
+                if (!this.rowCache[child.cid]) {
+                    this.rowCache[child.cid] = vueRender(h, child, parentView, slotScopes);
+                }
+                return { key: child.cid, vnode: this.rowCache[child.cid] };
+            },
+        },
+        render(h) {
+            const lazy = model.get('length') !== null;
+            const lazyChildren = model.get('_lazy_children') || {};
+            const children = lazy ? null : model.get('children') || [];
+            const count = lazy ? model.get('length') : children.length;
+            const itemHeight = model.get('item_height');
+            const { start, stop } = visibleRange(
+                this.scrollTop, this.viewportHeight, itemHeight, model.get('overscan'), count,
+            );
+            if (lazy) {
+                this.requestRange(start, stop, lazyChildren);
+            }
+            const rows = [];
+            for (let i = start; i < stop; ++i) {
+                rows.push(this.renderRow(h, lazy ? lazyChildren[i] : children[i], i));
+            }
+
+            /* forget the rows that went out of view, so their views are removed */
+            const visible = new Set(rows.map(({ key }) => key));
+            Object.keys(this.rowCache)
+                .filter(cid => !visible.has(cid))
+                .forEach((cid) => { delete this.rowCache[cid]; });
+
+            /* widgets in elements are cached by renderElement */
+            if (this.childCache) {
+                updateCache(this);
+            }
+
+            return h('div', {
+                class: model.get('class_'),
+                style: [{ height: model.get('height'), overflowY: 'auto' }, model.get('style_')],
+                on: { scroll: this.onScroll },
+            }, [
+                h('div', { style: { height: `${count * itemHeight}px` } }, [
+                    h('div', { style: { transform: `translateY(${start * itemHeight}px)` } },
+                        rows.map(({ key, vnode }) => h('div', {
+                            key,
+                            style: { height: `${itemHeight}px`, overflow: 'hidden' },
+                        }, vnode === null ? [] : [vnode]))),
+                ]),
+            ]);
+        },
+    }, { ...model.get('slot') && { slot: model.get('slot') } });
+}
@@ -2,6 +2,7 @@
 import {
     DOMWidgetModel, unpack_models,
 } from '@jupyter-widgets/base';
+import { applyClassDefaults } from './ClassDefaults';
 
 export class VueModel extends DOMWidgetModel {
     defaults() {
@@ -25,13 +26,20 @@ export class VueModel extends DOMWidgetModel {
                 attributes: null,
                 v_slots: null,
                 v_on: null,
+                _defaults: null,
             },
         };
     }
+
+    initialize(attributes, options) {
+        super.initialize(attributes, options);
+        applyClassDefaults(this, attributes);
+    }
 }
 
 VueModel.serializers = {
     ...DOMWidgetModel.serializers,
     children: { deserialize: unpack_models },
     v_slots: { deserialize: unpack_models },
+    _defaults: { deserialize: unpack_models },
 };
@@ -3,7 +3,11 @@ import * as base from '@jupyter-widgets/base';
 import { vueTemplateRender } from './VueTemplateRenderer'; // eslint-disable-line import/no-cycle
 import { VueModel } from './VueModel';
 import { VueTemplateModel } from './VueTemplateModel';
+import { VirtualScrollModel } from './VirtualScrollModel';
+import { virtualScrollRender } from './VirtualScrollRenderer'; // eslint-disable-line import/no-cycle
 import Vue from './VueWithCompiler';
+import { rateLimit } from './syncScheduler';
+import { createEventListeners } from './eventModifiers';
 
 const JupyterPhosphorWidget = base.JupyterPhosphorWidget || base.JupyterLuminoWidget;
 
@@ -74,17 +78,63 @@ function pickSerializable(object, depth=0, max_depth=2) {
     return obj;
 }
 
-export function eventToObject(event) {
+function toSerializable(value) {
+    if (value instanceof Node) {
+        return { id: value.id };
+    }
+    if (value instanceof Window) {
+        return 'Window';
+    }
+    if (value instanceof Object) {
+        return pickSerializable(value, 1);
+    }
+    return value;
+}
+
+/* Picks fields, e.g. ['clientX', 'target.value'], into an object of the same shape */
+function pickFields(object, fields) {
+    const result = {};
+    fields.forEach((field) => {
+        const path = field.split('.');
+        const value = path.reduce((obj, key) => (obj == null ? undefined : obj[key]), object);
+        const parent = path.slice(0, -1).reduce((obj, key) => {
+            if (!(obj[key] instanceof Object)) {
+                obj[key] = {}; // eslint-disable-line no-param-reassign
+            }
+            return obj[key];
+        }, result);
+        parent[path[path.length - 1]] = toSerializable(value);
+    });
+    return result;
+}
+
+export function eventToObject(event, fields) {
+    if (fields && event instanceof Object) {
+        return pickFields(event, fields);
+    }
     if (event instanceof Event) {
         return pickSerializable(event);
     }
     return event;
 }
 
+/* Returns a function that sends an event (or value) to the kernel, with the fields and rate
+ * limiting of options (see VueWidget.on_event). The fields are picked right away, since
+ * event objects are reused by the browser. */
+export function createEventSender(send, options = {}) {
+    const limitedSend = options.policy && options.policy !== 'immediate'
+        ? rateLimit(send, options)
+        : send;
+    return (event, ...args) => limitedSend(eventToObject(event, options.fields), ...args);
+}
+
 export function vueRender(createElement, model, parentView, slotScopes) {
     if (model instanceof VueTemplateModel) {
         return vueTemplateRender(createElement, model, parentView);
     }
+    if (model instanceof VirtualScrollModel) {
+        return virtualScrollRender(createElement, model, parentView, slotScopes);
+    }
     if (!(model instanceof VueModel)) {
         return createElement(createObjectForNestedModel(model, parentView));
     }
@@ -120,7 +170,7 @@ function addListeners(model, vueModel) {
     const listener = () => {
         vueModel.$forceUpdate();
     };
-    const use = key => key === '_events' || (!key.startsWith('_') && !['v_model'].includes(key));
+    const use = key => ['_events', '_event_options'].includes(key) || (!key.startsWith('_') && !['v_model'].includes(key));
 
     model.keys()
         .filter(use)
@@ -149,50 +199,23 @@ function createAttrsMapping(model) {
         }, {});
 }
 
-function addEventWithModifiers(eventAndModifiers, obj, fn) { // eslint-disable-line no-unused-vars
-    /* Example Vue.compile output:
-     * (function anonymous() {
-     *         with (this) {
-     *             return _c('dummy', {
-     *                 on: {
-     *                     "[event]": function ($event) {
-     *                         if (!$event.type.indexOf('key') && _k($event.keyCode, "c", ...)
-     *                             return null;
-     *                         ...
-     *                         return [fn]($event)
-     *                     }
-     *                 }
-     *             })
-     *         }
-     *     }
-     * )
-     */
-    const { on } = Vue.compile(`<dummy @${eventAndModifiers}="fn"></dummy>`)
-        .render.bind({
-            _c: (_, data) => data,
-            _k: Vue.prototype._k,
-            fn,
-        })();
-
-    return {
-        ...obj,
-        ...on,
-    };
-}
+const NO_EVENTS = [];
+const NO_OPTIONS = {};
 
-function createEventMapping(model, parentView) {
-    return (model.get('_events') || [])
-        .reduce((result, eventAndModifiers) => addEventWithModifiers(
-            eventAndModifiers,
-            result,
-            (e) => {
-                model.send({
-                    event: eventAndModifiers,
-                    data: eventToObject(e),
-                },
-                model.callbacks(parentView));
+function createEventMapping(model, vueModel, parentView) {
+    return createEventListeners(
+        Vue,
+        vueModel,
+        model.get('_events') || NO_EVENTS,
+        model.get('_event_options') || NO_OPTIONS,
+        (eventAndModifiers, options) => createEventSender((data) => {
+            model.send({
+                event: eventAndModifiers,
+                data,
             },
-        ), {});
+            model.callbacks(parentView));
+        }, options),
+    );
 }
 
 function createSlots(createElement, model, vueModel, parentView, slotScopes) {
@@ -244,7 +267,7 @@ function createContent(createElement, model, vueModel, parentView, slotScopes) {
     const scopedSlots = createSlots(createElement, model, vueModel, parentView, slotScopes);
 
     return {
-        on: { ...createEventMapping(model, parentView), ...slotUseOn(model, slotScopes) },
+        on: { ...createEventMapping(model, vueModel, parentView), ...slotUseOn(model, slotScopes) },
         ...model.get('style_') && { style: model.get('style_') },
         ...model.get('class_') && { class: model.get('class_') },
         ...scopedSlots && { scopedSlots: vueModel._u(scopedSlots) },
@@ -266,33 +289,52 @@ function createContent(createElement, model, vueModel, parentView, slotScopes) {
 }
 
 function renderChildren(createElement, children, vueModel, parentView, slotScopes) {
+    /* cid -> vnode, and the cids rendered since the last updateCache */
     if (!vueModel.childCache) {
-        vueModel.childCache = {}; // eslint-disable-line no-param-reassign
+        vueModel.childCache = new Map(); // eslint-disable-line no-param-reassign
     }
     if (!vueModel.childIds) {
-        vueModel.childIds = []; // eslint-disable-line no-param-reassign
+        vueModel.childIds = new Set(); // eslint-disable-line no-param-reassign
     }
     const childViewModels = children.map((child) => {
         if (typeof (child) === 'string') {
             return child;
         }
-        vueModel.childIds.push(child.cid);
+        if (child.element) {
+            return renderElement(createElement, child.element, vueModel, parentView, slotScopes);
+        }
+        vueModel.childIds.add(child.cid);
 
-        if (vueModel.childCache[child.cid]) {
-            return vueModel.childCache[child.cid];
+        const cached = vueModel.childCache.get(child.cid);
+        if (cached) {
+            return cached;
         }
         const vm = vueRender(createElement, child, parentView, slotScopes);
-        vueModel.childCache[child.cid] = vm; // eslint-disable-line no-param-reassign
+        vueModel.childCache.set(child.cid, vm);
         return vm;
     });
 
     return childViewModels;
 }
 
-function updateCache(vueModel) {
-    Object.keys(vueModel.childCache)
-        .filter(key => !vueModel.childIds.includes(key))
-        // eslint-disable-next-line no-param-reassign
-        .forEach(key => delete vueModel.childCache[key]);
-    vueModel.childIds = []; // eslint-disable-line no-param-reassign
+/* Elements (ipyvue.Element) are plain nodes sent as part of the state of their parent widget */
+export function renderElement(createElement, element, vueModel, parentView, slotScopes) {
+    return createElement(
+        element.tag,
+        {
+            ...element.class_ && { class: element.class_ },
+            ...element.style_ && { style: element.style_ },
+            ...element.attributes && { attrs: element.attributes },
+        },
+        renderChildren(createElement, element.children, vueModel, parentView, slotScopes),
+    );
+}
+
+export function updateCache(vueModel) {
+    vueModel.childCache.forEach((_, cid) => {
+        if (!vueModel.childIds.has(cid)) {
+            vueModel.childCache.delete(cid);
+        }
+    });
+    vueModel.childIds.clear();
 }
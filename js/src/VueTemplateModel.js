@@ -1,5 +1,9 @@
 /* eslint camelcase: off */
 import { DOMWidgetModel, unpack_models } from '@jupyter-widgets/base';
+import _ from 'lodash';
+import { applyPatch, createPatch } from './jsonPatch';
+import { applyClassDefaults } from './ClassDefaults';
+import { RpcClient } from './rpc';
 
 export class VueTemplateModel extends DOMWidgetModel {
     defaults() {
@@ -20,9 +24,108 @@ export class VueTemplateModel extends DOMWidgetModel {
                 data: null,
                 events: null,
                 _component_instances: null,
+                _patch_traits: null,
+                _sync_policies: null,
+                _defaults: null,
+                _rpc_methods: null,
             },
         };
     }
+
+    initialize(attributes, options) {
+        super.initialize(attributes, options);
+        applyClassDefaults(this, attributes);
+        this.patchCounts = {};
+        /* changes: watcher triggers, messages: messages sent for them, suppressed: messages
+         * saved by coalescing changes (see sync_policy) */
+        this.syncStats = { changes: 0, messages: 0, suppressed: 0 };
+        this.rpc = new RpcClient(this);
+        this.on('msg:custom', (content, buffers) => {
+            if (content.patch) {
+                this.applyPatches(content.patch);
+            }
+            if (content.rpc_results) {
+                this.rpc.handleResults(content, buffers);
+            }
+        });
+    }
+
+    isPatchTrait(prop) {
+        return Object.prototype.hasOwnProperty.call(this.get('_patch_traits') || {}, prop);
+    }
+
+    /* Patches from the backend are applied in place, without a change event or marking the
+     * attribute as changed, views are notified with a 'patch' event instead. */
+    applyPatches(patches) {
+        Object.entries(patches).forEach(([prop, ops]) => {
+            const serializer = this.constructor.serializers[prop];
+            if (!serializer || !serializer.deserialize) {
+                this.applyPatchOps(prop, _.cloneDeep(ops));
+                return;
+            }
+            /* Values can contain widget references, which are resolved asynchronously. Like state
+             * updates, the patch waits for earlier state changes to keep the order. */
+            this.state_change = this.state_change
+                .then(() => Promise.all(ops.map(op => ('value' in op
+                    ? Promise.resolve(serializer.deserialize(op.value, this.widget_manager))
+                        .then(value => ({ ...op, value }))
+                    : op))))
+                .then(deserializedOps => this.applyPatchOps(prop, deserializedOps));
+        });
+    }
+
+    applyPatchOps(prop, ops) {
+        this.attributes[prop] = applyPatch(this.get(prop), ops);
+        this.trigger('patch', prop, ops);
+    }
+
+    /* Returns the json patch from the current value of prop to value, and applies it to the
+     * attribute. Returns null when a full sync is due instead. */
+    takePatch(prop, value) {
+        const ops = createPatch(this.get(prop), value);
+        if (ops.length === 0) {
+            return ops;
+        }
+        this.patchCounts[prop] = (this.patchCounts[prop] || 0) + 1;
+        if (this.patchCounts[prop] >= this.get('_patch_traits')[prop]) {
+            this.patchCounts[prop] = 0;
+            return null;
+        }
+        this.attributes[prop] = applyPatch(this.get(prop), _.cloneDeep(ops));
+        return _.cloneDeep(ops);
+    }
+
+    /* Sends changed values from the template (a Map of prop to value) to the backend, using at
+     * most one patch message and one state update. */
+    sendChanges(changes, callbacks) {
+        const patches = {};
+        const changed = [];
+        changes.forEach((value, prop) => {
+            const ops = this.isPatchTrait(prop) ? this.takePatch(prop, value) : null;
+            if (ops) {
+                if (ops.length) {
+                    patches[prop] = ops;
+                }
+                return;
+            }
+            /* Don't send changes received from backend back */
+            if (_.isEqual(value, this.get(prop))) {
+                return;
+            }
+            this.set(prop, value === undefined ? null : _.cloneDeep(value));
+            changed.push(prop);
+        });
+        const patchCount = Object.keys(patches).length;
+        if (patchCount) {
+            this.send({ patch: patches }, callbacks);
+        }
+        if (changed.length) {
+            this.save_changes(callbacks);
+        }
+        const messages = (patchCount ? 1 : 0) + (changed.length ? 1 : 0);
+        this.syncStats.messages += messages;
+        this.syncStats.suppressed += patchCount + changed.length - messages;
+    }
 }
 
 VueTemplateModel.serializers = {
@@ -30,4 +133,5 @@ VueTemplateModel.serializers = {
     template: { deserialize: unpack_models },
     components: { deserialize: unpack_models },
     _component_instances: { deserialize: unpack_models },
+    _defaults: { deserialize: unpack_models },
 };
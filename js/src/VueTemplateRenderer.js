@@ -1,20 +1,28 @@
 import { WidgetModel } from '@jupyter-widgets/base';
 import uuid4 from 'uuid/v4';
 import _ from 'lodash';
-import Vue from 'vue';
+import Vue from './VueWithCompiler';
 import { parseComponent } from '@mariobuikhuizen/vue-compiler-addon';
-import { createObjectForNestedModel, eventToObject, vueRender } from './VueRenderer'; // eslint-disable-line import/no-cycle
+import { createEventSender, createObjectForNestedModel, vueRender } from './VueRenderer'; // eslint-disable-line import/no-cycle
 import { VueModel } from './VueModel';
 import { VueTemplateModel } from './VueTemplateModel';
 import httpVueLoader from './httpVueLoader';
 import { TemplateModel } from './Template';
+import { applyPatch } from './jsonPatch';
+import { createRowView, isColumnar } from './columnar';
+import { createSyncScheduler } from './syncScheduler';
+import { createRpcMethods } from './rpc';
+import { getCachedTemplate, hashString, invalidateTemplate } from './templateCache';
+import { toRenderFunctions } from './precompiled';
+import { acquireStyle } from './cssRegistry';
 
 function normalizeScopeId(value) {
     return String(value).replace(/[^a-zA-Z0-9_-]/g, '-');
 }
 
-function getScopeId(model, cssId) {
-    const base = cssId || model.cid;
+/* Widgets with the same css share a scope, so they can share the scoped style as well */
+function getScopeId(css, cssId) {
+    const base = cssId || `h${hashString(css)}`;
     return `data-s-${normalizeScopeId(base)}`;
 }
 
@@ -25,59 +33,48 @@ function applyScopeId(vm, scopeId) {
     vm.$el.setAttribute(scopeId, '');
 }
 
-function scopeStyleElement(styleElt, scopeId) {
-    const scopeSelector = `[${scopeId}]`;
+export function vueTemplateRender(createElement, model, parentView) {
+    return createElement(createTemplateBoundary(model, parentView));
+}
 
-    function scopeRules(rules, insertRule, deleteRule) {
-        for (let i = 0; i < rules.length; ++i) {
-            const rule = rules[i];
-            if (rule.type === 1 && rule.selectorText) {
-                const scopedSelectors = [];
-                rule.selectorText.split(/\s*,\s*/).forEach((sel) => {
-                    scopedSelectors.push(`${scopeSelector} ${sel}`);
-                    const segments = sel.match(/([^ :]+)(.+)?/);
-                    if (segments) {
-                        scopedSelectors.push(`${segments[1]}${scopeSelector}${segments[2] || ''}`);
-                    }
-                });
-                const scopedRule = scopedSelectors.join(',') + rule.cssText.substring(rule.selectorText.length);
-                deleteRule(i);
-                insertRule(scopedRule, i);
-            }
-            if (rule.cssRules && rule.cssRules.length && rule.insertRule && rule.deleteRule) {
-                scopeRules(rule.cssRules, rule.insertRule.bind(rule), rule.deleteRule.bind(rule));
-            }
-        }
-    }
+function getTemplateModel(model) {
+    return model.get('template') instanceof TemplateModel ? model.get('template') : model;
+}
 
-    function process() {
-        const sheet = styleElt.sheet;
-        if (!sheet) {
-            return;
-        }
-        scopeRules(sheet.cssRules, sheet.insertRule.bind(sheet), sheet.deleteRule.bind(sheet));
+/* Wraps the component of a template, so a change of the template only recreates this component
+ * (and its children), instead of rerendering the whole tree from the root. */
+function createTemplateBoundary(model, parentView) {
+    if (!(model instanceof VueTemplateModel)) {
+        return createComponentObject(model, parentView);
     }
-
-    try {
-        process();
-    } catch (ex) {
-        if (typeof DOMException !== 'undefined' && ex instanceof DOMException && ex.code === DOMException.INVALID_ACCESS_ERR) {
-            styleElt.sheet.disabled = true;
-            styleElt.addEventListener('load', function onStyleLoaded() {
-                styleElt.removeEventListener('load', onStyleLoaded);
-                setTimeout(() => {
-                    process();
-                    styleElt.sheet.disabled = false;
-                });
+    const templateModel = getTemplateModel(model);
+    return {
+        inheritAttrs: false,
+        created() {
+            this.component = createComponentObject(model, parentView);
+            this.__onTemplateChange = () => {
+                /* VueComponentModel also triggers change:template, without a change of the
+                 * template, to pick up a changed component */
+                const previous = templateModel.previous('template');
+                if (typeof previous === 'string' && previous !== templateModel.get('template')) {
+                    invalidateTemplate(previous);
+                }
+                this.component = createComponentObject(model, parentView);
+                this.$forceUpdate();
+            };
+            templateModel.on('change:template', this.__onTemplateChange);
+        },
+        beforeDestroy() {
+            templateModel.off('change:template', this.__onTemplateChange);
+        },
+        render(createElement) {
+            return createElement(this.component, {
+                attrs: this.$attrs,
+                on: this.$listeners,
+                scopedSlots: this.$scopedSlots,
             });
-            return;
-        }
-        throw ex;
-    }
-}
-
-export function vueTemplateRender(createElement, model, parentView) {
-    return createElement(createComponentObject(model, parentView));
+        },
+    };
 }
 
 function createComponentObject(model, parentView) {
@@ -92,11 +89,12 @@ function createComponentObject(model, parentView) {
         return createObjectForNestedModel(model, parentView);
     }
 
-    const isTemplateModel = model.get('template') instanceof TemplateModel;
-    const templateModel = isTemplateModel ? model.get('template') : model;
+    const templateModel = getTemplateModel(model);
     const template = templateModel.get('template');
     const sourceCodeFile = `VUE_TEMPLATE_SCRIPT_${model.cid}`;
-    const vuefile = readVueFile(template, sourceCodeFile);
+    const { vuefile, render, staticRenderFns } = getCachedTemplate(
+        template, () => compileVueFile(template, sourceCodeFile, templateModel.get('compiled')),
+    );
 
     const css = model.get('css') || (vuefile.STYLE && vuefile.STYLE.content);
     const cssId = (vuefile.STYLE && vuefile.STYLE.id);
@@ -108,48 +106,7 @@ function createComponentObject(model, parentView) {
     const useScoped = scoped !== null && scoped !== undefined
         ? scoped
         : (scopedCssSupport && scopedFromTemplate);
-    const scopeId = useScoped && css ? getScopeId(model, cssId) : null;
-
-    if (css) {
-        if (cssId) {
-            const prefixedCssId = `ipyvue-${cssId}`;
-            let style = document.getElementById(prefixedCssId);
-            if (!style) {
-                style = document.createElement('style');
-                style.id = prefixedCssId;
-                document.head.appendChild(style);
-            }
-            if (scopeId) {
-                if (style.innerHTML !== css || style.getAttribute('data-ipyvue-scope') !== scopeId) {
-                    style.innerHTML = css;
-                    scopeStyleElement(style, scopeId);
-                    style.setAttribute('data-ipyvue-scope', scopeId);
-                }
-            } else {
-                // Reset innerHTML if CSS changed or if transitioning from scoped to unscoped
-                // (need to reset to remove the scoped CSS rule transformations)
-                const wasScoped = style.getAttribute('data-ipyvue-scope');
-                if (style.innerHTML !== css || wasScoped) {
-                    style.innerHTML = css;
-                    if (wasScoped) {
-                        style.removeAttribute('data-ipyvue-scope');
-                    }
-                }
-            }
-        } else {
-            const style = document.createElement('style');
-            style.id = model.cid;
-            style.innerHTML = css;
-            document.head.appendChild(style);
-            if (scopeId) {
-                scopeStyleElement(style, scopeId);
-                style.setAttribute('data-ipyvue-scope', scopeId);
-            }
-            parentView.once('remove', () => {
-                document.head.removeChild(style);
-            });
-        }
-    }
+    const scopeId = useScoped && css ? getScopeId(css, cssId) : null;
 
     // eslint-disable-next-line no-new-func
     const methods = model.get('methods') ? Function(`return ${model.get('methods').replace('\n', ' ')}`)() : {};
@@ -175,13 +132,18 @@ function createComponentObject(model, parentView) {
             return { ...data, ...dataTemplate, ...createDataMapping(model) };
         },
         beforeCreate() {
+            /* before the watchers are created, immediate watchers use it right away */
+            this.__syncScheduler = createSyncScheduler(model, model.callbacks(parentView));
+            /* the methods decorated with ipyvue.rpc, e.g. await this.$py.search(query) */
+            this.$py = createRpcMethods(model, model.callbacks(parentView));
+            /* the calls in progress of methods decorated with ipyvue.offload, e.g.
+             * :loading="!!$inFlight.compute" */
+            this.__releaseInFlight = exposeInFlight(model, this);
+            /* before rendering, so the content is never shown unstyled */
+            this.__releaseStyle = css ? acquireStyle(css, scopeId, cssId) : null;
             callVueFn('beforeCreate', this);
         },
         created() {
-            this.__onTemplateChange = () => {
-                this.$root.$forceUpdate();
-            };
-            templateModel.on('change:template', this.__onTemplateChange);
             addModelListeners(model, this);
             callVueFn('created', this);
         },
@@ -197,9 +159,7 @@ function createComponentObject(model, parentView) {
             ...createFullVueComponents(fullVueComponents),
         },
         computed: { ...vuefile.SCRIPT && vuefile.SCRIPT.computed, ...aliasRefProps(model) },
-        template: vuefile.TEMPLATE === undefined && vuefile.SCRIPT === undefined && vuefile.STYLE === undefined
-            ? template
-            : vuefile.TEMPLATE,
+        ...render && { render, staticRenderFns },
         beforeMount() {
             applyScopeId(this, scopeId);
             callVueFn('beforeMount', this);
@@ -216,36 +176,65 @@ function createComponentObject(model, parentView) {
             callVueFn('updated', this);
         },
         beforeDestroy() {
-            templateModel.off('change:template', this.__onTemplateChange);
+            this.__syncScheduler.flush();
             callVueFn('beforeDestroy', this);
         },
         destroyed() {
+            if (this.__releaseStyle) {
+                this.__releaseStyle();
+            }
+            this.__releaseInFlight();
             callVueFn('destroyed', this);
         },
     };
 }
 
+/* _in_flight is not template data: that would add a deep watcher to every template, and could
+ * clash with the data of the template. It is exposed read-only as vm.$inFlight instead. */
+function exposeInFlight(model, vm) {
+    const state = Vue.observable({ inFlight: model.get('_in_flight') || {} });
+    Object.defineProperty(vm, '$inFlight', { get: () => state.inFlight });
+    const update = () => {
+        state.inFlight = model.get('_in_flight') || {};
+    };
+    model.on('change:_in_flight', update);
+    return () => model.off('change:_in_flight', update);
+}
+
 function createDataMapping(model) {
     return model.keys()
         .filter(prop => !prop.startsWith('_')
             && !['events', 'template', 'components', 'layout', 'css', 'scoped', 'scoped_css_support', 'data', 'methods'].includes(prop))
         .reduce((result, prop) => {
-            result[prop] = _.cloneDeep(model.get(prop)); // eslint-disable-line no-param-reassign
+            result[prop] = toVueData(model.get(prop)); // eslint-disable-line no-param-reassign
             return result;
         }, {});
 }
 
+/* Columnar data is exposed as a lazy row view instead of a copy */
+function toVueData(value) {
+    return isColumnar(value) ? createRowView(value) : _.cloneDeep(value);
+}
+
 function addModelListeners(model, vueModel) {
     model.keys()
         .filter(prop => !prop.startsWith('_')
             && !['v_model', 'components', 'layout', 'css', 'scoped', 'scoped_css_support', 'data', 'methods'].includes(prop))
         // eslint-disable-next-line no-param-reassign
         .forEach(prop => model.on(`change:${prop}`, () => {
-            if (_.isEqual(model.get(prop), vueModel[prop])) {
+            if (!isColumnar(model.get(prop)) && _.isEqual(model.get(prop), vueModel[prop])) {
                 return;
             }
-            vueModel[prop] = _.cloneDeep(model.get(prop));
+            vueModel[prop] = toVueData(model.get(prop));
         }));
+    model.on('patch', (prop, ops) => {
+        /* patches of traits that are not template data, like _component_instances, are handled
+         * by their own listeners */
+        if (!(prop in vueModel.$data)) {
+            return;
+        }
+        vueModel[prop] = applyPatch(vueModel[prop], _.cloneDeep(ops)); // eslint-disable-line no-param-reassign
+    });
     model.on('msg:custom', (content, buffers) => {
         if (!content['method']) {
             return;
@@ -284,15 +273,14 @@ function createWatches(model, parentView, templateWatchers) {
                 if (templateWatchers && templateWatchers[prop]) {
                     callTemplateWatcher(this, templateWatchers[prop], value, oldValue);
                 }
-                /* Don't send changes received from backend back */
-                if (_.isEqual(value, model.get(prop))) {
+                /* Columnar data is read-only in the frontend */
+                if (isColumnar(model.get(prop))) {
                     return;
                 }
-
-                model.set(prop, value === undefined ? null : _.cloneDeep(value));
-                model.save_changes(model.callbacks(parentView));
+                this.__syncScheduler.schedule(prop, value);
             },
-            deep: true,
+            /* a deep watch would create all rows of a row view */
+            deep: !isColumnar(model.get(prop)),
             immediate: watchesImmediately(templateWatchers && templateWatchers[prop]),
         },
     }), {})
@@ -303,7 +291,15 @@ function createWatches(model, parentView, templateWatchers) {
 }
 
 function createMethods(model, parentView) {
+    const options = model.get('_event_options') || {};
     return model.get('events').reduce((result, event) => {
+        const send = createEventSender((data, buffers) => {
+            model.send(
+                {event, data},
+                model.callbacks(parentView),
+                buffers,
+            );
+        }, options[event]);
         // eslint-disable-next-line no-param-reassign
         result[event] = (value, buffers) => {
             if (buffers) {
@@ -314,11 +310,7 @@ function createMethods(model, parentView) {
                     buffers = undefined;
                 }
             }
-            model.send(
-                {event, data: eventToObject(value)},
-                model.callbacks(parentView),
-                buffers,
-            );
+            send(value, buffers);
         }
         return result;
     }, {});
@@ -327,11 +319,26 @@ function createMethods(model, parentView) {
 function createInstanceComponents(components, parentView) {
     return components.reduce((result, [name, model]) => {
         // eslint-disable-next-line no-param-reassign
-        result[name] = createComponentObject(model, parentView);
+        result[name] = createTemplateBoundary(model, parentView);
         return result;
     }, {});
 }
 
+/* Creates and destroys of class component instances in the same tick, e.g. of all rows rendered
+ * by a v-for, are sent in a single message */
+function queueComponentRequest(containerModel, type, request, callbacks) {
+    if (!containerModel.componentRequests) {
+        // eslint-disable-next-line no-param-reassign, camelcase
+        containerModel.componentRequests = { create_widgets: [], destroy_widgets: [] };
+        Promise.resolve().then(() => {
+            const requests = containerModel.componentRequests;
+            containerModel.componentRequests = null; // eslint-disable-line no-param-reassign
+            containerModel.send(_.pickBy(requests, list => list.length), callbacks);
+        });
+    }
+    containerModel.componentRequests[type].push(request);
+}
+
 function createClassComponents(components, containerModel, parentView) {
     return components.reduce((accumulator, [componentName, componentSpec]) => ({
         ...accumulator,
@@ -346,31 +353,24 @@ function createClassComponents(components, containerModel, parentView) {
             },
             created() {
                 const fn = () => {
-                    if (!this.model) {
-                        const newModel = containerModel.get('_component_instances').find(wm => wm.model_id === this.id);
-                        if (newModel) {
-                            this.model = newModel;
-                        }
-                    } else {
-                        containerModel.off('change:_component_instances', fn);
+                    const instances = containerModel.get('_component_instances') || {};
+                    if (!this.model && instances[this.id]) {
+                        this.model = instances[this.id];
+                    }
+                    if (this.model) {
+                        containerModel.off('change:_component_instances patch', fn);
                     }
                 };
-                containerModel.on('change:_component_instances', fn);
-                containerModel.send(
-                    {
-                        create_widget: componentSpec.class, // eslint-disable-line camelcase
-                        id: this.id,
-                        props: this.$options.propsData,
-                    },
-                    containerModel.callbacks(parentView),
-                );
+                containerModel.on('change:_component_instances patch', fn);
+                queueComponentRequest(containerModel, 'create_widgets', {
+                    create_widget: componentSpec.class, // eslint-disable-line camelcase
+                    id: this.id,
+                    props: this.$options.propsData,
+                }, containerModel.callbacks(parentView));
             },
             destroyed() {
-                containerModel.send(
-                    {
-                        destroy_widget: this.id, // eslint-disable-line camelcase
-                    },
-                    containerModel.callbacks(parentView),
+                queueComponentRequest(
+                    containerModel, 'destroy_widgets', this.id, containerModel.callbacks(parentView),
                 );
             },
             watch: componentSpec.props.reduce((watchAccumulator, prop) => ({
@@ -424,6 +424,23 @@ function aliasRefProps(model) {
         }), {});
 }
 
+/* Parses the template, evaluates its script and compiles its template to render functions, unless
+ * they were already compiled in the kernel */
+function compileVueFile(template, sourceURL, compiled) {
+    const vuefile = readVueFile(template, sourceURL);
+    if (compiled) {
+        return { vuefile, ...toRenderFunctions(compiled) };
+    }
+    const templateContent = vuefile.TEMPLATE === undefined && vuefile.SCRIPT === undefined
+        && vuefile.STYLE === undefined
+        ? template
+        : vuefile.TEMPLATE;
+    return {
+        vuefile,
+        ...templateContent !== undefined && Vue.compile(templateContent),
+    };
+}
+
 function readVueFile(fileContent, sourceURL) {
     const component = parseComponent(fileContent, { pad: 'line' });
     const result = {};
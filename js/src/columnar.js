@@ -0,0 +1,88 @@
+/* Row views on column oriented data sent by the ipyvue.Columns trait type. */
+
+const ARRAY_TYPES = {
+    bool: Uint8Array,
+    int8: Int8Array,
+    uint8: Uint8Array,
+    int16: Int16Array,
+    uint16: Uint16Array,
+    int32: Int32Array,
+    uint32: Uint32Array,
+    float32: Float32Array,
+    float64: Float64Array,
+};
+
+export function isColumnar(value) {
+    return value !== null && typeof value === 'object' && value.format === 'ipyvue.columns';
+}
+
+function toTypedArray(dataView, ArrayType) {
+    const { buffer, byteOffset, byteLength } = dataView;
+    if (byteOffset % ArrayType.BYTES_PER_ELEMENT === 0) {
+        return new ArrayType(buffer, byteOffset, byteLength / ArrayType.BYTES_PER_ELEMENT);
+    }
+    /* typed arrays need aligned offsets, so unaligned message buffers have to be copied */
+    return new ArrayType(buffer.slice(byteOffset, byteOffset + byteLength));
+}
+
+function createColumnGetter({ dtype, buffer, codes, categories }) {
+    if (dtype === 'category') {
+        const codeArray = toTypedArray(codes, Int32Array);
+        return i => (codeArray[i] < 0 ? null : categories[codeArray[i]]);
+    }
+    const values = toTypedArray(buffer, ARRAY_TYPES[dtype]);
+    if (dtype === 'bool') {
+        return i => values[i] === 1;
+    }
+    return i => values[i];
+}
+
+function isIndex(key, length) {
+    if (typeof key !== 'string') {
+        return false;
+    }
+    const index = Number(key);
+    return Number.isInteger(index) && index >= 0 && index < length && String(index) === key;
+}
+
+/* Returns a read-only array of row objects, a row is only created when it is accessed. Vue does
+ * not observe the array (which would create all rows), so it can only be replaced as a whole.
+ */
+export function createRowView(value) {
+    const { columns, length, data } = value;
+    const getters = columns.map(name => [name, createColumnGetter(data[name])]);
+    const rows = new Array(length);
+
+    function getRow(index) {
+        if (!rows[index]) {
+            const row = {};
+            getters.forEach(([name, get]) => {
+                row[name] = get(index);
+            });
+            rows[index] = Object.freeze(row);
+        }
+        return rows[index];
+    }
+
+    const target = [];
+    target.length = length;
+    /* _isVue (vue 2.6) and __v_skip (vue 2.7) keep Vue from observing the array */
+    Object.defineProperty(target, '_isVue', { value: true });
+    Object.defineProperty(target, '__v_skip', { value: true });
+    Object.defineProperty(target, 'columns', { value: columns });
+
+    return new Proxy(target, {
+        get(obj, key, receiver) {
+            if (isIndex(key, length)) {
+                return getRow(Number(key));
+            }
+            return Reflect.get(obj, key, receiver);
+        },
+        has(obj, key) {
+            return isIndex(key, length) || Reflect.has(obj, key);
+        },
+        set() {
+            return false;
+        },
+    });
+}
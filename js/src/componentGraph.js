@@ -0,0 +1,75 @@
+/* Which components and templates use which components, so a changed component only rerenders
+ * the templates that use it (directly or through other components). The graph is updated when
+ * a component or template source is set, instead of searching all sources on each change. */
+
+/* user (component name or template model) -> names of the components it uses */
+const uses = new Map();
+/* component name -> users of the component */
+const usedBy = new Map();
+
+function tagNames(source) {
+    const names = new Set();
+    const re = /<([A-Za-z][\w-]*)[\s/>]/g;
+    let match = re.exec(source || '');
+    while (match) {
+        names.add(match[1]);
+        match = re.exec(source);
+    }
+    return names;
+}
+
+function removeUser(user) {
+    (uses.get(user) || []).forEach((name) => {
+        const users = usedBy.get(name);
+        users.delete(user);
+        if (!users.size) {
+            usedBy.delete(name);
+        }
+    });
+    uses.delete(user);
+}
+
+function setSource(user, source) {
+    removeUser(user);
+    const names = tagNames(source);
+    uses.set(user, names);
+    names.forEach((name) => {
+        if (!usedBy.has(name)) {
+            usedBy.set(name, new Set());
+        }
+        usedBy.get(name).add(user);
+    });
+}
+
+export function setComponentSource(name, source) {
+    setSource(name, source);
+}
+
+export function setTemplateSource(templateModel, source) {
+    setSource(templateModel, source);
+}
+
+export function removeTemplate(templateModel) {
+    removeUser(templateModel);
+}
+
+/* Returns the template models that use the component, directly or through other components */
+export function templatesUsingComponent(name) {
+    const visited = new Set([name]);
+    const queue = [name];
+    const templates = [];
+    while (queue.length) {
+        (usedBy.get(queue.pop()) || []).forEach((user) => {
+            if (visited.has(user)) {
+                return;
+            }
+            visited.add(user);
+            if (typeof user === 'string') {
+                queue.push(user);
+            } else {
+                templates.push(user);
+            }
+        });
+    }
+    return templates;
+}
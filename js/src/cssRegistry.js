@@ -0,0 +1,120 @@
+/* Style elements shared by all views that use the same css. Each unique css (and scope) is
+ * added to the document once, and removed when the last view using it is destroyed. */
+import { hashString } from './templateCache';
+
+/* key -> { element, css, scopeId, refs } */
+const styles = new Map();
+/* scoped css text by `${scopeId}\n${css}`, so css is only scoped rule by rule once */
+const scopedCss = new Map();
+const stats = { elements: 0, shared: 0 };
+
+export function scopeStyleElement(styleElt, scopeId, onScoped) {
+    const scopeSelector = `[${scopeId}]`;
+
+    function scopeRules(rules, insertRule, deleteRule) {
+        for (let i = 0; i < rules.length; ++i) {
+            const rule = rules[i];
+            if (rule.type === 1 && rule.selectorText) {
+                const scopedSelectors = [];
+                rule.selectorText.split(/\s*,\s*/).forEach((sel) => {
+                    scopedSelectors.push(`${scopeSelector} ${sel}`);
+                    const segments = sel.match(/([^ :]+)(.+)?/);
+                    if (segments) {
+                        scopedSelectors.push(`${segments[1]}${scopeSelector}${segments[2] || ''}`);
+                    }
+                });
+                const scopedRule = scopedSelectors.join(',') + rule.cssText.substring(rule.selectorText.length);
+                deleteRule(i);
+                insertRule(scopedRule, i);
+            }
+            if (rule.cssRules && rule.cssRules.length && rule.insertRule && rule.deleteRule) {
+                scopeRules(rule.cssRules, rule.insertRule.bind(rule), rule.deleteRule.bind(rule));
+            }
+        }
+    }
+
+    function process() {
+        const sheet = styleElt.sheet;
+        if (!sheet) {
+            return;
+        }
+        scopeRules(sheet.cssRules, sheet.insertRule.bind(sheet), sheet.deleteRule.bind(sheet));
+        if (onScoped) {
+            onScoped(Array.from(sheet.cssRules).map(rule => rule.cssText).join('\n'));
+        }
+    }
+
+    try {
+        process();
+    } catch (ex) {
+        if (typeof DOMException !== 'undefined' && ex instanceof DOMException && ex.code === DOMException.INVALID_ACCESS_ERR) {
+            styleElt.sheet.disabled = true;
+            styleElt.addEventListener('load', function onStyleLoaded() {
+                styleElt.removeEventListener('load', onStyleLoaded);
+                setTimeout(() => {
+                    process();
+                    styleElt.sheet.disabled = false;
+                });
+            });
+            return;
+        }
+        throw ex;
+    }
+}
+
+function setContent(element, css, scopeId) {
+    if (!scopeId) {
+        element.textContent = css; // eslint-disable-line no-param-reassign
+        element.removeAttribute('data-ipyvue-scope');
+        return;
+    }
+    const memoKey = `${scopeId}\n${css}`;
+    element.setAttribute('data-ipyvue-scope', scopeId);
+    if (scopedCss.has(memoKey)) {
+        element.textContent = scopedCss.get(memoKey); // eslint-disable-line no-param-reassign
+        return;
+    }
+    element.textContent = css; // eslint-disable-line no-param-reassign
+    scopeStyleElement(element, scopeId, text => scopedCss.set(memoKey, text));
+}
+
+/* Adds css to the document, unless it is already in use. Styles with a cssId (<style id="...">
+ * in a template) share one element per id, which is updated when the css changes. Returns a
+ * function that releases the style again. */
+export function acquireStyle(css, scopeId, cssId) {
+    const key = cssId ? `id:${cssId}` : `${scopeId || ''}\n${css}`;
+    let entry = styles.get(key);
+    if (!entry) {
+        const element = document.createElement('style');
+        element.id = cssId ? `ipyvue-${cssId}` : `ipyvue-style-${hashString(key)}`;
+        document.head.appendChild(element);
+        entry = { element, css: null, scopeId: null, refs: 0 };
+        styles.set(key, entry);
+        stats.elements += 1;
+    } else {
+        stats.shared += 1;
+    }
+    if (entry.css !== css || entry.scopeId !== scopeId) {
+        setContent(entry.element, css, scopeId);
+        entry.css = css;
+        entry.scopeId = scopeId;
+    }
+    entry.refs += 1;
+
+    let released = false;
+    return () => {
+        if (released) {
+            return;
+        }
+        released = true;
+        entry.refs -= 1;
+        if (entry.refs === 0 && styles.get(key) === entry) {
+            styles.delete(key);
+            entry.element.remove();
+        }
+    };
+}
+
+export function cssRegistryStats() {
+    return { ...stats, active: styles.size };
+}
@@ -0,0 +1,67 @@
+/* Event listeners with modifiers (e.g. click.stop) for VueWidgets, compiled by Vue like @click.stop
+ * in a template. This module has no imports, Vue is passed in, so benchmarks/render_events.js can
+ * load it in Node.js.
+ */
+
+/* event_and_modifiers -> the render function compiled for it */
+const modifierRenderCache = new Map();
+
+function compileEventWithModifiers(Vue, eventAndModifiers) {
+    let render = modifierRenderCache.get(eventAndModifiers);
+    if (!render) {
+        ({ render } = Vue.compile(`<dummy @${eventAndModifiers}="fn"></dummy>`));
+        modifierRenderCache.set(eventAndModifiers, render);
+    }
+    return render;
+}
+
+export function addEventWithModifiers(Vue, eventAndModifiers, obj, fn) {
+    /* Example Vue.compile output:
+     * (function anonymous() {
+     *         with (this) {
+     *             return _c('dummy', {
+     *                 on: {
+     *                     "[event]": function ($event) {
+     *                         if (!$event.type.indexOf('key') && _k($event.keyCode, "c", ...)
+     *                             return null;
+     *                         ...
+     *                         return [fn]($event)
+     *                     }
+     *                 }
+     *             })
+     *         }
+     *     }
+     * )
+     * The compiled function is the same for every widget, so it is cached and fn is bound when
+     * it is called.
+     */
+    const { on } = compileEventWithModifiers(Vue, eventAndModifiers).call({
+        _c: (_, data) => data,
+        _k: Vue.prototype._k,
+        fn,
+    });
+
+    return {
+        ...obj,
+        ...on,
+    };
+}
+
+/* Returns the listeners for events (a list of event_and_modifiers) of a widget rendered by
+ * vueModel. createHandler(eventAndModifiers, eventOptions) returns the function handling an event.
+ * The listeners only change when events or options change, reusing them spares Vue updating the
+ * listeners on every render. */
+export function createEventListeners(Vue, vueModel, events, options, createHandler) {
+    const cached = vueModel.eventMappingCache;
+    if (cached && cached.events === events && cached.options === options) {
+        return cached.on;
+    }
+    const on = events.reduce((result, eventAndModifiers) => addEventWithModifiers(
+        Vue,
+        eventAndModifiers,
+        result,
+        createHandler(eventAndModifiers, options[eventAndModifiers]),
+    ), {});
+    vueModel.eventMappingCache = { events, options, on }; // eslint-disable-line no-param-reassign
+    return on;
+}
@@ -3,9 +3,13 @@ export { VueModel } from './VueModel';
 export { VueTemplateModel } from './VueTemplateModel';
 export { VueView, createViewContext } from './VueView';
 export { HtmlModel } from './Html';
+export { VirtualScrollModel } from './VirtualScrollModel';
 export { TemplateModel } from './Template';
 export { ForceLoadModel } from './ForceLoad';
+export { ClassDefaultsModel } from './ClassDefaults';
 export { vueRender } from './VueRenderer';
 export { VueComponentModel } from './VueComponentModel';
+export { templateCacheStats } from './templateCache';
+export { cssRegistryStats } from './cssRegistry';
 
 export const { version } = require('../package.json'); // eslint-disable-line global-require
@@ -0,0 +1,88 @@
+/* Minimal RFC 6902 (JSON Patch) support, the counterpart of ipyvue/JsonPatch.py.
+ * Only add, remove and replace operations are generated and understood.
+ */
+import Vue from 'vue';
+
+function escapeKey(key) {
+    return String(key).replace(/~/g, '~0').replace(/\//g, '~1');
+}
+
+function unescapeToken(token) {
+    return token.replace(/~1/g, '/').replace(/~0/g, '~');
+}
+
+function isPlainObject(value) {
+    return value !== null && typeof value === 'object' && !Array.isArray(value)
+        && !ArrayBuffer.isView(value) && !(value instanceof ArrayBuffer);
+}
+
+function diff(oldValue, newValue, path, ops) {
+    if (oldValue === newValue) {
+        return;
+    }
+    if (Array.isArray(oldValue) && Array.isArray(newValue)) {
+        const common = Math.min(oldValue.length, newValue.length);
+        for (let i = 0; i < common; ++i) {
+            diff(oldValue[i], newValue[i], `${path}/${i}`, ops);
+        }
+        /* remove from the back, so the indices of the remaining items stay valid */
+        for (let i = oldValue.length - 1; i >= common; --i) {
+            ops.push({ op: 'remove', path: `${path}/${i}` });
+        }
+        for (let i = common; i < newValue.length; ++i) {
+            ops.push({ op: 'add', path: `${path}/${i}`, value: newValue[i] });
+        }
+    } else if (isPlainObject(oldValue) && isPlainObject(newValue)) {
+        Object.keys(oldValue).forEach((key) => {
+            if (!Object.prototype.hasOwnProperty.call(newValue, key)) {
+                ops.push({ op: 'remove', path: `${path}/${escapeKey(key)}` });
+            }
+        });
+        Object.keys(newValue).forEach((key) => {
+            const itemPath = `${path}/${escapeKey(key)}`;
+            if (Object.prototype.hasOwnProperty.call(oldValue, key)) {
+                diff(oldValue[key], newValue[key], itemPath, ops);
+            } else {
+                ops.push({ op: 'add', path: itemPath, value: newValue[key] });
+            }
+        });
+    } else {
+        ops.push({ op: 'replace', path, value: newValue });
+    }
+}
+
+/* Returns the operations that turn oldValue into newValue. */
+export function createPatch(oldValue, newValue) {
+    const ops = [];
+    diff(oldValue, newValue, '', ops);
+    return ops;
+}
+
+/* Applies ops in place and returns the (possibly replaced) root. Mutations go through Vue.set,
+ * Vue.delete and splice, so this works for both plain and reactive (Vue data) documents.
+ */
+export function applyPatch(document, ops) {
+    return ops.reduce((root, { op, path, value }) => {
+        if (!path) {
+            return value;
+        }
+        const tokens = path.substring(1).split('/').map(unescapeToken);
+        const parent = tokens.slice(0, -1).reduce((obj, token) => obj[token], root);
+        const last = tokens[tokens.length - 1];
+        if (Array.isArray(parent)) {
+            const index = last === '-' ? parent.length : parseInt(last, 10);
+            if (op === 'remove') {
+                parent.splice(index, 1);
+            } else if (op === 'add') {
+                parent.splice(index, 0, value);
+            } else {
+                parent.splice(index, 1, value);
+            }
+        } else if (op === 'remove') {
+            Vue.delete(parent, last);
+        } else {
+            Vue.set(parent, last, value);
+        }
+        return root;
+    }, document);
+}
@@ -0,0 +1,20 @@
+/* Render functions compiled in the kernel (ipyvue/Precompile.py) are sent as source code */
+export function toRenderFunctions({ render, staticRenderFns }) {
+    return {
+        // eslint-disable-next-line no-new-func
+        render: new Function(render),
+        // eslint-disable-next-line no-new-func
+        staticRenderFns: staticRenderFns.map(code => new Function(code)),
+    };
+}
+
+/* Uses the precompiled render functions for a component loaded by httpVueLoader */
+export function withRenderFunctions(loadComponent, compiled) {
+    if (!compiled) {
+        return loadComponent;
+    }
+    return () => loadComponent().then(({ template, ...component }) => ({
+        ...component,
+        ...toRenderFunctions(compiled),
+    }));
+}
@@ -0,0 +1,79 @@
+/* eslint camelcase: off */
+/* Calls of the methods of a VueTemplate decorated with ipyvue.rpc. Calls made in the same tick are
+ * sent in a single message, results of methods with a cache_ttl are cached per arguments.
+ */
+import { put_buffers, remove_buffers } from '@jupyter-widgets/base';
+
+export class RpcClient {
+    constructor(model) {
+        this.model = model;
+        this.nextId = 0;
+        /* id -> { resolve, reject } */
+        this.pending = new Map();
+        /* method and arguments as json -> { expires, promise } */
+        this.cache = new Map();
+        this.queue = null;
+    }
+
+    call(method, args, callbacks) {
+        const { cache_ttl } = (this.model.get('_rpc_methods') || {})[method] || {};
+        if (!cache_ttl) {
+            return this.request(method, args, callbacks);
+        }
+        const key = JSON.stringify([method, args]);
+        const cached = this.cache.get(key);
+        if (cached && cached.expires > Date.now()) {
+            return cached.promise;
+        }
+        const promise = this.request(method, args, callbacks);
+        this.cache.set(key, { expires: Date.now() + cache_ttl * 1000, promise });
+        promise.catch(() => this.cache.delete(key));
+        return promise;
+    }
+
+    request(method, args, callbacks) {
+        const id = this.nextId;
+        this.nextId += 1;
+        if (!this.queue) {
+            this.queue = { calls: [], callbacks };
+            Promise.resolve().then(() => this.flush());
+        }
+        this.queue.calls.push({ id, method, args });
+        return new Promise((resolve, reject) => {
+            this.pending.set(id, { resolve, reject });
+        });
+    }
+
+    flush() {
+        const { calls, callbacks } = this.queue;
+        this.queue = null;
+        /* ArrayBuffers and typed arrays in the arguments are sent as binary buffers */
+        const { state, buffer_paths, buffers } = remove_buffers({ rpc: calls });
+        this.model.send({ ...state, buffer_paths }, callbacks, buffers);
+    }
+
+    handleResults(content, buffers) {
+        put_buffers(content, content.buffer_paths || [], buffers || []);
+        content.rpc_results.forEach(({ id, result, error }) => {
+            const pending = this.pending.get(id);
+            if (!pending) {
+                return;
+            }
+            this.pending.delete(id);
+            if (error !== undefined) {
+                pending.reject(new Error(error));
+            } else {
+                pending.resolve(result);
+            }
+        });
+    }
+}
+
+/* The object available as this.$py in a template */
+export function createRpcMethods(model, callbacks) {
+    return Object.keys(model.get('_rpc_methods') || {}).reduce((result, method) => {
+        // eslint-disable-next-line no-param-reassign
+        result[method] = (...args) => model.rpc.call(method, args, callbacks);
+        return result;
+    }, {});
+}
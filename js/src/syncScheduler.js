@@ -0,0 +1,126 @@
+/* Coalesces changes made in a template before they are sent to the backend, according to the
+ * sync policies of the model (see VueTemplate.sync_policy):
+ *  - immediate: send right away
+ *  - tick: send once per tick
+ *  - raf: send once per animation frame
+ *  - debounce: send when there were no changes for `wait` ms
+ *  - throttle: send at most once every `wait` ms
+ * Every flush sends all pending changes together. The same policies limit the rate of events, see
+ * ipyvue.event_handler.
+ */
+const DEFAULT_POLICY = { policy: 'immediate', wait: 0 };
+
+/* Returns a function that calls fn with the arguments of its latest call, according to policy.
+ * Calls in between are dropped. flush() calls fn right away if a call is pending, cancel() drops
+ * it.
+ */
+export function rateLimit(fn, { policy, wait }) {
+    let pendingArgs = null;
+    let timer = null;
+    let scheduled = false;
+    let lastCall = 0;
+
+    function run() {
+        clearTimeout(timer);
+        timer = null;
+        scheduled = false;
+        if (!pendingArgs) {
+            return;
+        }
+        const args = pendingArgs;
+        pendingArgs = null;
+        lastCall = Date.now();
+        fn(...args);
+    }
+
+    function limited(...args) {
+        pendingArgs = args;
+        switch (policy) {
+            case 'tick':
+                if (!scheduled) {
+                    scheduled = true;
+                    Promise.resolve().then(run);
+                }
+                break;
+            case 'raf':
+                if (!scheduled) {
+                    scheduled = true;
+                    window.requestAnimationFrame(run);
+                }
+                break;
+            case 'debounce':
+                clearTimeout(timer);
+                timer = setTimeout(run, wait);
+                break;
+            case 'throttle': {
+                const elapsed = Date.now() - lastCall;
+                if (elapsed >= wait) {
+                    run();
+                } else if (!timer) {
+                    timer = setTimeout(run, wait - elapsed);
+                }
+                break;
+            }
+            default:
+                run();
+        }
+    }
+    limited.flush = run;
+    limited.cancel = () => {
+        pendingArgs = null;
+        run();
+    };
+    return limited;
+}
+
+export function createSyncScheduler(model, callbacks) {
+    const pending = new Map();
+    /* prop -> { policy, limited }, a rate limited flush per prop */
+    const limiters = new Map();
+
+    function policyFor(prop) {
+        const policies = model.get('_sync_policies') || {};
+        return policies[prop] || policies['*'] || DEFAULT_POLICY;
+    }
+
+    function flush() {
+        if (pending.size === 0) {
+            return;
+        }
+        const changes = new Map(pending);
+        pending.clear();
+        model.sendChanges(changes, callbacks);
+    }
+
+    function limiterFor(prop) {
+        const policy = policyFor(prop);
+        const existing = limiters.get(prop);
+        if (existing && existing.policy === policy) {
+            return existing.limited;
+        }
+        if (existing) {
+            existing.limited.cancel();
+        }
+        const limited = rateLimit(flush, policy);
+        limiters.set(prop, { policy, limited });
+        return limited;
+    }
+
+    function schedule(prop, value) {
+        model.syncStats.changes += 1;
+        if (pending.has(prop)) {
+            model.syncStats.suppressed += 1;
+        }
+        pending.set(prop, value);
+        limiterFor(prop)();
+    }
+
+    return {
+        schedule,
+        /* sends pending changes right away, e.g. before the template is destroyed */
+        flush() {
+            limiters.forEach(({ limited }) => limited.cancel());
+            flush();
+        },
+    };
+}
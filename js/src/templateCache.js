@@ -0,0 +1,48 @@
+/* LRU cache of parsed and compiled templates, keyed by a hash of the template source, so
+ * templates shared by many widgets are only parsed, evaluated and compiled once. */
+const MAX_ENTRIES = 500;
+
+const cache = new Map();
+const stats = { hits: 0, misses: 0 };
+
+/* 32-bit FNV-1a */
+export function hashString(str) {
+    let hash = 0x811c9dc5;
+    for (let i = 0; i < str.length; ++i) {
+        hash ^= str.charCodeAt(i);
+        hash = Math.imul(hash, 0x01000193);
+    }
+    return (hash >>> 0).toString(16); // eslint-disable-line no-bitwise
+}
+
+export function getCachedTemplate(content, create) {
+    const key = hashString(content);
+    const entry = cache.get(key);
+    /* the content is compared as well, to be safe from hash collisions */
+    if (entry && entry.content === content) {
+        stats.hits += 1;
+        /* move to the end, the first entry is the least recently used one */
+        cache.delete(key);
+        cache.set(key, entry);
+        return entry.value;
+    }
+    stats.misses += 1;
+    const value = create();
+    cache.set(key, { content, value });
+    if (cache.size > MAX_ENTRIES) {
+        cache.delete(cache.keys().next().value);
+    }
+    return value;
+}
+
+export function invalidateTemplate(content) {
+    const key = hashString(content);
+    const entry = cache.get(key);
+    if (entry && entry.content === content) {
+        cache.delete(key);
+    }
+}
+
+export function templateCacheStats() {
+    return { ...stats, size: cache.size };
+}
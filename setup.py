@@ -185,9 +185,15 @@ setup(
         "dev": [
             "pre-commit",
         ],
+        "benchmark": [
+            "pytest-benchmark",
+        ],
     },
     packages=find_packages(exclude=["tests", "tests.*"]),
     zip_safe=False,
+    entry_points={
+        "console_scripts": ["ipyvue-precompile = ipyvue.Precompile:main"],
+    },
     cmdclass={
         "build_py": js_prerelease(build_py),
         "egg_info": js_prerelease(egg_info),
@@ -6,9 +6,10 @@ if sys.version_info < (3, 7):
 
 import ipyvue as vue
 import playwright.sync_api
+from playwright.sync_api import expect
 
 from IPython.display import display
-from traitlets import default, Int, Callable, Unicode
+from traitlets import default, Int, Callable, List, Unicode
 
 
 class MyTemplate(vue.VueTemplate):
@@ -230,3 +231,51 @@ def test_template_scoped_css_trait(
     )
     assert scoped_color == "rgb(0, 128, 0)"
     assert unscoped_color != "rgb(0, 128, 0)"
+
+
+class RowItem(vue.VueTemplate):
+    label = Unicode("").tag(sync=True)
+
+    @default("template")
+    def _default_vue_template(self):
+        return """
+        <template>
+            <span class="row-item">{{label}}</span>
+        </template>
+        """
+
+
+class RowsTemplate(vue.VueTemplate):
+    rows = List(Unicode()).tag(sync=True)
+    title = Unicode("Rows").tag(sync=True)
+
+    @default("components")
+    def _default_components(self):
+        return {"row-item": RowItem}
+
+    @default("template")
+    def _default_vue_template(self):
+        return """
+        <template>
+            <div>
+                <h3 class="rows-title">{{title}}</h3>
+                <row-item v-for="row in rows" :key="row" :label="row"></row-item>
+            </div>
+        </template>
+        """
+
+
+def test_class_components_patched(solara_test, page_session: playwright.sync_api.Page):
+    widget = RowsTemplate(rows=[f"row {i}" for i in range(10)])
+    display(widget)
+    rows = page_session.locator(".row-item")
+    expect(rows).to_have_count(10)
+
+    # one new instance is sent as a patch of _component_instances
+    widget.rows = widget.rows + ["row 10"]
+    expect(rows).to_have_count(11)
+    page_session.locator("text=row 10").wait_for()
+
+    # later updates of the template are still applied
+    widget.title = "Updated"
+    page_session.locator(".rows-title >> text=Updated").wait_for()
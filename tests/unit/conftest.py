@@ -0,0 +1,26 @@
+import pytest
+from comm import DummyComm
+
+
+class CommMessages(list):
+    """The comm messages sent as (comm_id, data, buffers), and in opened the states
+    of the comms opened."""
+
+    def __init__(self):
+        super().__init__()
+        self.opened = []
+
+
+@pytest.fixture
+def comm_messages(monkeypatch):
+    """Records the comm messages sent by all widgets as (comm_id, data, buffers)."""
+    messages = CommMessages()
+
+    def publish_msg(self, msg_type, data=None, metadata=None, buffers=None, **keys):
+        if msg_type == "comm_open":
+            messages.opened.append(data["state"])
+        elif msg_type == "comm_msg":
+            messages.append((self.comm_id, data, buffers))
+
+    monkeypatch.setattr(DummyComm, "publish_msg", publish_msg)
+    return messages
@@ -0,0 +1,87 @@
+import pytest
+
+import ipyvue
+from ipyvue import Reconciler, h
+
+
+def _items(keys, label=str):
+    return [h("li", label(k), key=k, class_=f"item-{k}") for k in keys]
+
+
+def test_reconcile_keyed_children(comm_messages):
+    opened = comm_messages.opened
+    container = ipyvue.Html(tag="ul")
+    reconciler = Reconciler(container)
+    reconciler.render(_items([1, 2, 3]))
+    widgets = {w.children[0]: w for w in container.children}
+    assert [w.class_ for w in container.children] == ["item-1", "item-2", "item-3"]
+
+    opened.clear()
+    comm_messages.clear()
+    # reorder, remove 2, add 4 and change the label of 3
+    reconciler.render(_items([3, 1, 4], lambda k: f"{k}!" if k == 3 else str(k)))
+
+    assert container.children[1] is widgets["1"]
+    assert container.children[0] is widgets["3"]
+    assert widgets["2"].comm is None
+    # only the new item is created
+    assert [state["children"] for state in opened] == [["4"]]
+    # the label and the order of the children are sent in one message
+    [(_, data, _)] = comm_messages
+    updates = {u["model_id"]: u["state"] for u in data["content"]["batch"]}
+    assert updates == {
+        widgets["3"].model_id: {"children": ["3!"]},
+        container.model_id: {
+            "children": [f"IPY_MODEL_{w.model_id}" for w in container.children]
+        },
+    }
+
+    comm_messages.clear()
+    reconciler.render(_items([3, 1, 4], lambda k: f"{k}!" if k == 3 else str(k)))
+    assert comm_messages == []
+
+
+def test_reconcile_traits_and_events():
+    clicks = []
+
+    def on_click(widget, event, data):
+        clicks.append(widget)
+
+    container = ipyvue.Html(tag="div")
+    reconciler = Reconciler(container)
+
+    reconciler.render(
+        h("button", "ok", style_="color: red", events={"click": on_click})
+    )
+    [button] = container.children
+    assert button._events == ["click"]
+    button.fire_event("click", {})
+    assert clicks == [button]
+
+    reconciler.render(h("button", "ok", events={"click.stop": on_click}))
+    assert container.children == [button]
+    assert button.style_ is None
+    assert button._events == ["click.stop"]
+
+    # a different tag replaces the widget
+    reconciler.render([h("span", "ok"), None])
+    [span] = container.children
+    assert span.tag == "span" and button.comm is None
+
+    reconciler.close()
+    assert span.comm is None and container.children == []
+
+
+def test_reconcile_duplicate_keys():
+    container = ipyvue.Html(tag="ul")
+    reconciler = Reconciler(container)
+    reconciler.render(_items([1, 2]))
+    items = list(container.children)
+
+    with pytest.raises(ValueError, match="Duplicate key 1"):
+        reconciler.render(_items([1, 1]))
+    with pytest.raises(ValueError, match="Duplicate key 'a'"):
+        reconciler.render(h("li", [h("span", key="a"), h("span", key="a")]))
+    # nothing changed
+    assert container.children == items
+    assert all(item.comm is not None for item in items)
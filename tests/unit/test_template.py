@@ -0,0 +1,49 @@
+import logging
+
+from ipyvue.Template import _push_file, get_template
+
+log = logging.getLogger("ipyvue")
+
+
+def test_unchanged_template_is_not_sent(tmp_path, comm_messages):
+    path = tmp_path / "component.vue"
+    path.write_text("<template><div/></template>")
+    template = get_template(str(path))
+    get_template(str(path))
+    _push_file(str(path), log)
+    assert comm_messages == []
+
+    path.write_text("<template><span/></template>")
+    _push_file(str(path), log)
+    [(comm_id, data, _)] = comm_messages
+    assert comm_id == template.model_id
+    assert data["state"] == {"template": "<template><span/></template>"}
+
+
+def test_source_cache(tmp_path, monkeypatch):
+    from ipyvue import SourceCache
+
+    monkeypatch.setenv("IPYVUE_SOURCE_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(SourceCache, "_entries", {})
+    path = tmp_path / "component.vue"
+    path.write_text("<template><div/></template>")
+    assert SourceCache.read_source(str(path)) == "<template><div/></template>"
+
+    # within the validate interval, the file is not checked
+    path.write_text("<template><span/></template>")
+    assert SourceCache.read_source(str(path)) == "<template><div/></template>"
+    SourceCache.invalidate(str(path))
+    assert SourceCache.read_source(str(path)) == "<template><span/></template>"
+
+    # another kernel reads the source from the shared index
+    monkeypatch.setattr(SourceCache, "_entries", {})
+    monkeypatch.setattr("builtins.open", _fail_for(str(path), open))
+    assert SourceCache.read_source(str(path)) == "<template><span/></template>"
+
+
+def _fail_for(failing_path, open_):
+    def checked_open(path, *args, **kwargs):
+        assert str(path) != failing_path
+        return open_(path, *args, **kwargs)
+
+    return checked_open
@@ -0,0 +1,525 @@
+import asyncio
+import threading
+
+import pytest
+from ipywidgets.widgets.widget import _put_buffers
+from traitlets import Dict, Int, List, TraitError, Unicode
+
+from ipyvue import (
+    Columns,
+    VueTemplate,
+    columns_serialization,
+    event_handler,
+    offload,
+    rpc,
+)
+from ipyvue.JsonPatch import apply_patch, make_patch
+from ipyvue.VueTemplateWidget import as_refs
+
+
+class PatchTemplate(VueTemplate):
+    template = "<template><div/></template>"
+    items = List().tag(sync=True, patch=True)
+
+
+def test_json_patch_roundtrip():
+    old = {"rows": [{"a": 1, "b": "x"}, {"a": 2}], "a/b": 1, "gone": True}
+    new = {"rows": [{"a": 1, "b": "y"}, {"a": 2}, {"a": 3}], "a/b": 2}
+    ops = make_patch(old, new)
+    assert {"op": "replace", "path": "/rows/0/b", "value": "y"} in ops
+    assert {"op": "replace", "path": "/a~1b", "value": 2} in ops
+    assert apply_patch(old, ops) == new
+    # the original is left untouched, unchanged subtrees are shared
+    assert old["rows"][0]["b"] == "x"
+    assert apply_patch(old, ops)["rows"][1] is old["rows"][1]
+    assert make_patch(new, new) == []
+
+
+def test_patch_trait_sends_patch(comm_messages):
+    widget = PatchTemplate(items=[{"value": i} for i in range(10)])
+    assert widget._patch_traits["items"] == widget.patch_resync_interval
+
+    items = [dict(item) for item in widget.items]
+    items[3]["value"] = 42
+    widget.items = items
+
+    [(_, data, _)] = comm_messages
+    assert data == {
+        "method": "custom",
+        "content": {
+            "patch": {"items": [{"op": "replace", "path": "/3/value", "value": 42}]}
+        },
+    }
+
+
+def test_patch_trait_periodic_full_sync(comm_messages):
+    class ResyncTemplate(PatchTemplate):
+        items = List().tag(sync=True, patch=2)
+
+    widget = ResyncTemplate(items=[0, 1, 2, 3])
+    widget.items = [1, 1, 2, 3]
+    widget.items = [1, 2, 2, 3]
+    assert [data["method"] for _, data, _ in comm_messages] == ["custom", "update"]
+
+
+def test_patch_trait_in_hold_sync(comm_messages):
+    class TitledTemplate(PatchTemplate):
+        title = Unicode().tag(sync=True)
+
+    widget = TitledTemplate(items=list(range(10)))
+    with widget.hold_sync():
+        widget.title = "rows"
+        widget.items = widget.items + [10]
+
+    # sent with the held state, not as a patch ahead of it
+    [(_, data, _)] = comm_messages
+    assert data["method"] == "update"
+    assert data["state"] == {"title": "rows", "items": list(range(11))}
+
+    widget.items = widget.items + [11]
+    assert comm_messages[-1][1]["content"] == {
+        "patch": {"items": [{"op": "add", "path": "/11", "value": 11}]}
+    }
+
+
+def test_patch_from_frontend(comm_messages):
+    widget = PatchTemplate(items=[{"value": 0}, {"value": 1}])
+    original = widget.items
+    widget._handle_event(
+        None,
+        {"patch": {"items": [{"op": "replace", "path": "/1/value", "value": 2}]}},
+        [],
+    )
+    assert widget.items == [{"value": 0}, {"value": 2}]
+    assert original == [{"value": 0}, {"value": 1}]
+    # changes coming from the frontend are not sent back
+    assert comm_messages == []
+
+
+class TableTemplate(VueTemplate):
+    template = "<template><div/></template>"
+    table = Columns().tag(sync=True)
+
+
+def test_columns_sent_as_buffers(comm_messages):
+    widget = TableTemplate()
+    widget.table = {
+        "x": [0.5, 1.5, 2.5],
+        "n": [1, 2, 3],
+        "flag": [True, False, True],
+        "name": ["a", "b", "a"],
+        "other": ["x", None, 1],
+    }
+    [(_, data, buffers)] = comm_messages
+    assert len(buffers) == 5
+    table = data["state"]["table"]
+    assert table["length"] == 3
+    assert table["data"]["name"] == {"dtype": "category", "categories": ["a", "b"]}
+    assert {column["dtype"] for column in table["data"].values()} == {
+        "float64",
+        "int32",
+        "bool",
+        "category",
+    }
+
+    _put_buffers(data["state"], data["buffer_paths"], buffers)
+    assert columns_serialization["from_json"](table, widget) == {
+        "x": [0.5, 1.5, 2.5],
+        "n": [1, 2, 3],
+        "flag": [True, False, True],
+        "name": ["a", "b", "a"],
+        "other": ["x", None, "1"],
+    }
+
+
+def test_columns_validation():
+    with pytest.raises(TraitError):
+        TableTemplate(table={"a": [1, 2], "b": [1]})
+
+
+class PolicyTemplate(VueTemplate):
+    template = "<template><div/></template>"
+    value = Int(0).tag(sync=True, sync_policy="throttle", sync_wait=50)
+    other = Int(0).tag(sync=True)
+
+
+def test_sync_policies():
+    widget = PolicyTemplate(sync_policy="raf")
+    assert widget._sync_policies == {
+        "*": {"policy": "raf", "wait": 100},
+        "value": {"policy": "throttle", "wait": 50},
+    }
+    widget.sync_policy = "debounce"
+    assert widget._sync_policies["*"] == {"policy": "debounce", "wait": 100}
+    with pytest.raises(TraitError):
+        PolicyTemplate(sync_policy="sometimes")
+
+
+class PointerTemplate(VueTemplate):
+    template = "<template><div @mousemove='move'/></template>"
+
+    @event_handler(fields=["clientX", "target.value"], policy="raf")
+    def vue_move(self, data):
+        self.last = data
+
+    def vue_click(self, data):
+        pass
+
+
+def test_event_handler_options():
+    widget = PointerTemplate()
+    assert widget._event_options == {
+        "move": {"fields": ["clientX", "target.value"], "policy": "raf", "wait": 100}
+    }
+    widget._handle_event(None, {"event": "move", "data": {"clientX": 1}}, [])
+    assert widget.last == {"clientX": 1}
+    with pytest.raises(ValueError):
+        event_handler(policy="sometimes")
+
+
+class SearchTemplate(VueTemplate):
+    template = "<template><input @input='search($event.target.value)'/></template>"
+    results = List().tag(sync=True)
+
+    @event_handler(cancel_running=True)
+    async def vue_search(self, query):
+        await asyncio.sleep(0.01)
+        self.results = [query]
+
+
+def test_async_vue_method():
+    widget = SearchTemplate()
+
+    async def typing():
+        for query in ["a", "ab"]:
+            widget._handle_event(None, {"event": "search", "data": query}, [])
+        await asyncio.sleep(0.05)
+
+    asyncio.run(typing())
+    assert widget.results == ["ab"]
+    assert widget._handler_tasks["search"] == set()
+
+
+class ComputeTemplate(VueTemplate):
+    template = "<template><v-btn :loading='!!$inFlight.compute'/></template>"
+    total = Int(0).tag(sync=True)
+    threads = List()
+
+    @offload()
+    def vue_compute(self, n):
+        self.threads.append(threading.current_thread())
+        self.total = sum(range(n))
+
+    @offload()
+    def vue_compute_or_fail(self, n):
+        self.total = n
+        raise ValueError("failed")
+
+    @offload(executor="process")
+    @staticmethod
+    def vue_compute_in_process(n):
+        return {"total": sum(range(n))}
+
+
+def test_offload(comm_messages):
+    widget = ComputeTemplate()
+    in_flight = []
+    widget.observe(lambda change: in_flight.append(change["new"]), "_in_flight")
+
+    async def click():
+        widget._handle_event(None, {"event": "compute", "data": 10}, [])
+        await asyncio.sleep(0)
+        assert widget._in_flight == {"compute": 1}
+        await asyncio.wait(list(widget._handler_tasks["compute"]))
+
+    asyncio.run(click())
+    assert widget.total == 45
+    assert widget.threads[0] is not threading.main_thread()
+    assert in_flight == [{"compute": 1}, {}]
+    # the total and the in_flight count are sent together, from the kernel thread
+    [(_, data, _)] = comm_messages[-1:]
+    assert data["state"] == {"total": 45, "_in_flight": {}}
+
+    widget._handle_event(None, {"event": "compute_in_process", "data": 100}, [])
+    assert widget.total == 4950
+
+    async def fail():
+        widget._handle_event(None, {"event": "compute_or_fail", "data": 7}, [])
+        [task] = widget._handler_tasks["compute_or_fail"]
+        await asyncio.wait([task])
+        return task.exception()
+
+    assert isinstance(asyncio.run(fail()), ValueError)
+    # the changes made before the exception are sent anyway
+    [(_, data, _)] = comm_messages[-1:]
+    assert data["state"] == {"total": 7, "_in_flight": {}}
+    assert widget._in_flight == {}
+
+    with pytest.raises(TypeError, match="staticmethod"):
+
+        class Invalid(VueTemplate):
+            @offload(executor="process")
+            def vue_compute(self, n):
+                pass
+
+
+def test_precompile_without_compiler(monkeypatch):
+    import subprocess
+    from ipyvue import Precompile
+
+    def run(args, **kwargs):
+        raise subprocess.CalledProcessError(1, args, stderr="Cannot find module")
+
+    monkeypatch.setattr(subprocess, "run", run)
+    monkeypatch.setattr(Precompile, "_node_failed", False)
+    monkeypatch.setattr(Precompile, "_compiler_version", None)
+    assert Precompile.precompile("<template><div/></template>") is None
+    # the compiler may be installed later
+    assert not Precompile._node_failed
+
+    def run_without_node(args, **kwargs):
+        raise FileNotFoundError("node")
+
+    monkeypatch.setattr(subprocess, "run", run_without_node)
+    assert Precompile.precompile("<template><div/></template>") is None
+    assert Precompile._node_failed
+
+
+def test_precompile(monkeypatch, tmp_path):
+    from ipyvue import Precompile
+    from ipyvue.Template import Template
+
+    calls = []
+
+    def compile_with_node(sources):
+        calls.append(sources)
+        return [{"render": "with(this){return _c('div')}", "staticRenderFns": []}]
+
+    monkeypatch.setenv("IPYVUE_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(Precompile, "_compile_with_node", compile_with_node)
+    monkeypatch.setattr(Precompile, "_memory_cache", {})
+    monkeypatch.setattr(Precompile, "_compiler_version", "2.6.14")
+
+    template = Template(template="<template><div/></template>", precompile=True)
+    assert template.compiled["render"] == "with(this){return _c('div')}"
+    assert len(list(tmp_path.iterdir())) == 1
+
+    # a new kernel reads the render functions from the disk cache
+    monkeypatch.setattr(Precompile, "_memory_cache", {})
+    assert Precompile.precompile("<template><div/></template>") == template.compiled
+    assert len(calls) == 1
+
+    # render functions of another compiler version are not reused
+    monkeypatch.setattr(Precompile, "_compiler_version", "2.7.16")
+    Precompile.precompile("<template><div/></template>")
+    assert len(calls) == 2
+
+    template.precompile = False
+    assert template.compiled is None
+
+
+class RefTemplate(VueTemplate):
+    template = "<template><div/></template>"
+    config = Dict().tag(sync=True, sync_ref=True)
+    # only the refs are synced
+    db = Dict().tag(sync_ref=True)
+
+
+def test_as_refs_reuses_unchanged_subtrees():
+    old = {"a": {"x": [1, 2]}, "b": {"y": "z"}}
+    new = {**old, "b": {"y": "w"}}
+    old_refs = as_refs("config", old)
+    refs = as_refs("config", new, old, old_refs)
+    assert refs["a"] is old_refs["a"]
+    assert refs == as_refs("config", new)
+    assert refs["b"]["y"]["path"] == ["b", "y"]
+
+    # a nested container changed in place, with only the outer one copied
+    new["a"]["x"].append(3)
+    newer = {**new, "a": {**new["a"]}}
+    assert as_refs("config", newer, new, refs) == as_refs("config", newer)
+
+
+def test_sync_ref_patch(comm_messages):
+    widget = RefTemplate(config={"a": {"x": list(range(100))}, "b": {"y": 1}})
+    widget.config = {**widget.config, "b": {"y": 2}}
+    widget.config = {**widget.config, "c": 3}
+    updates = [data.get("state", {}) for _, data, _ in comm_messages]
+    patches = [data.get("content", {}).get("patch", {}) for _, data, _ in comm_messages]
+
+    # the refs are sent in full once, after that only the changed refs are sent
+    assert len([u for u in updates if "config_ref" in u]) == 1
+    [_, ops] = [p["config_ref"] for p in patches if "config_ref" in p]
+    assert [(op["op"], op["path"]) for op in ops] == [("add", "/c")]
+
+
+def test_sync_ref_patch_without_sync(comm_messages):
+    widget = RefTemplate(db={"users": [{"name": "a"}], "groups": []})
+    assert "db" not in widget.keys
+    assert "db_ref" in widget._patch_traits
+
+    comm_messages.clear()
+    widget.db = {**widget.db, "groups": ["admin"]}
+    [(_, data, _)] = comm_messages
+    assert [(op["op"], op["path"]) for op in data["content"]["patch"]["db_ref"]] == [
+        ("add", "/groups/0")
+    ]
+
+
+class Row(VueTemplate):
+    template = "<template><div>{{ label }}</div></template>"
+    label = Unicode("").tag(sync=True)
+
+
+class RowsTemplate(VueTemplate):
+    template = "<template><row v-for='i in 10' :label='i'/></template>"
+    components = Dict({"row": Row}).tag(
+        sync=True, **VueTemplate.class_component_serialization
+    )
+    component_pool_size = 1
+
+
+def test_component_instances(comm_messages):
+    widget = RowsTemplate()
+    row_class = [Row.__module__, "Row"]
+    creates = [
+        {"create_widget": row_class, "id": f"id{i}", "props": {"label": str(i)}}
+        for i in range(10)
+    ]
+    widget._handle_event(None, {"create_widgets": creates}, [])
+    assert len(widget._component_instances) == 10
+    first, last = widget._component_instances["id0"], widget._component_instances["id9"]
+
+    # one destroyed widget is kept for reuse, the other one is left open
+    comm_messages.clear()
+    widget._handle_event(
+        None,
+        {
+            "destroy_widgets": ["id0", "id9"],
+            "create_widgets": [{**creates[0], "id": "new", "props": {"label": "new"}}],
+        },
+        [],
+    )
+    assert "id0" not in widget._component_instances
+    assert widget._component_instances["new"] in (first, last)
+    assert widget._component_instances["new"].label == "new"
+    assert first.comm is not None and last.comm is not None
+    [ops] = [
+        d["content"]["patch"]["_component_instances"]
+        for _, d, _ in comm_messages
+        if "content" in d
+    ]
+    assert sorted(op["op"] for op in ops) == ["add", "remove", "remove"]
+
+
+def test_component_instances_without_pool():
+    class UnpooledTemplate(RowsTemplate):
+        component_pool_size = 0
+
+    widget = UnpooledTemplate()
+    create = {"create_widget": [Row.__module__, "Row"], "id": "id0", "props": {}}
+    widget._handle_event(None, {"create_widgets": [create]}, [])
+    row = widget._component_instances["id0"]
+    widget._handle_event(None, {"destroy_widgets": ["id0"]}, [])
+
+    # as before pooling, a destroyed instance stays usable
+    assert widget._component_instances == {}
+    assert row.comm is not None
+
+
+def test_resolve_ref():
+    widget = RefTemplate(config={"rows": [{"name": "a"}, {"name": "b"}]})
+    ref = {"objectRef": "config", "path": ["rows", 1, "name"], "id": 0}
+    assert widget._resolve_ref(ref) == "b"
+    assert widget._resolve_ref({"objectRef": "config"}) is widget.config
+    assert widget._resolve_ref({"objectRef": "config", "path": ["rows"]}) == [
+        {"name": "a"},
+        {"name": "b"},
+    ]
+
+
+def test_component_instances_allow_list():
+    widget = RowsTemplate()
+    create = {"create_widget": ["os", "system"], "id": "x", "props": {}}
+    with pytest.raises(ValueError):
+        widget._handle_event(None, {"create_widgets": [create]}, [])
+    assert widget._component_instances == {}
+
+
+class RpcTemplate(VueTemplate):
+    template = "<template><div/></template>"
+
+    @rpc(cache_ttl=10)
+    def rows(self, start, stop):
+        return list(range(start, stop))
+
+    @rpc
+    def blob(self, data):
+        return bytes(data)[::-1]
+
+    @rpc
+    def tags(self):
+        return {"a", "b"}
+
+    @rpc
+    async def slow(self):
+        await asyncio.sleep(0.01)
+        raise KeyError("missing")
+
+    def private(self):
+        return "secret"
+
+
+def test_rpc(comm_messages):
+    widget = RpcTemplate()
+    assert widget._rpc_methods == {
+        "blob": {},
+        "rows": {"cache_ttl": 10},
+        "slow": {},
+        "tags": {},
+    }
+
+    calls = [
+        {"id": 0, "method": "rows", "args": [0, 3]},
+        {"id": 1, "method": "blob", "args": [None]},
+        {"id": 2, "method": "private", "args": []},
+        {"id": 3, "method": "rows", "args": [0]},
+        {"id": 5, "method": "tags", "args": []},
+        {"id": 6, "method": "blob", "args": [None]},
+    ]
+    paths = [["rpc", 1, "args", 0], ["rpc", 5, "args", 0]]
+    content = {"rpc": calls, "buffer_paths": paths}
+    widget._handle_event(None, content, [memoryview(b"abc"), memoryview(b"de")])
+
+    # the results of all calls are sent in one message
+    [(_, data, buffers)] = comm_messages
+    results = data["content"]["rpc_results"]
+    assert results[0] == {"id": 0, "result": [0, 1, 2]}
+    assert data["content"]["buffer_paths"] == [
+        ["rpc_results", 1, "result"],
+        ["rpc_results", 5, "result"],
+    ]
+    assert [bytes(b) for b in buffers] == [b"cba", b"ed"]
+    assert results[2]["error"] == "'private' is not an rpc method of RpcTemplate"
+    assert results[3]["error"].startswith("TypeError:")
+    # a result that isn't JSON serializable rejects only its own call
+    assert results[4]["id"] == 5
+    assert results[4]["error"].startswith("TypeError:")
+
+    comm_messages.clear()
+    content = {"rpc": [{"id": 4, "method": "slow", "args": []}]}
+    widget._handle_event(None, content, [])
+    [(_, data, _)] = comm_messages
+    assert data["content"]["rpc_results"] == [{"id": 4, "error": "KeyError: 'missing'"}]
+
+
+def test_compact_state_dynamic_defaults(monkeypatch):
+    import ipyvue
+    from ipyvue.CompactState import _static_defaults
+
+    monkeypatch.setattr(ipyvue, "compact_state", True)
+    values = _static_defaults(PolicyTemplate())
+    # defaults generated per instance, by VueTemplate, are always sent
+    for name in ["_patch_traits", "_sync_policies", "_rpc_methods", "_event_options"]:
+        assert name not in values
+    assert values["css"] is None
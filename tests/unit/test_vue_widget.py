@@ -1,6 +1,9 @@
+import asyncio
 from unittest.mock import MagicMock
 
+import ipyvue
 from ipyvue import VueWidget
+from ipyvue.ForceLoad import force_load_instance
 
 
 class TestVueWidget:
@@ -77,3 +80,165 @@ def test_event_handling():
     event_handler.reset_mock()
     button._handle_event(None, dict(event="click.stop", data={"foo": "bar"}), [])
     event_handler.assert_called_once_with(button, "click.stop", {"foo": "bar"})
+
+
+def test_on_events(comm_messages):
+    button = VueWidget()
+    click, hover = MagicMock(), MagicMock()
+    button.on_events({"click": click, "mouseover.stop": hover, "keyup.enter": click})
+    assert button._events == ["click", "mouseover.stop", "keyup.enter"]
+    assert len(comm_messages) == 1
+
+    # a new registration replaces the one of the same event
+    button.on_event("click.prevent", hover)
+    button.fire_event("click", {})
+    hover.assert_called_once_with(button, "click.prevent", {})
+    click.assert_not_called()
+
+    button.on_events({"click": None, "keyup": None}, remove=True)
+    assert button._events == ["mouseover.stop"]
+
+
+def test_batch(comm_messages):
+    widgets = [VueWidget() for _ in range(3)]
+    with ipyvue.batch():
+        for widget in widgets:
+            widget.class_list.add("a")
+            widget.class_list.add("b")
+            widget.class_list.remove("a")
+        widgets[0].children = ["text"]
+
+    [(comm_id, data, buffers)] = comm_messages
+    assert comm_id == force_load_instance.model_id
+    updates = data["content"]["batch"]
+    assert [update["model_id"] for update in updates] == [w.model_id for w in widgets]
+    assert updates[0]["state"] == {"class_": "b", "children": ["text"]}
+    assert updates[1]["state"] == {"class_": "b"}
+
+
+def test_batch_single_widget(comm_messages):
+    widget = VueWidget()
+    with ipyvue.batch():
+        widget.class_list.add("a")
+        widget.style_ = "color: red"
+
+    [(comm_id, data, buffers)] = comm_messages
+    assert comm_id == widget.model_id
+    assert data["state"] == {"class_": "a", "style_": "color: red"}
+
+
+def test_virtual_scroll_lazy():
+    requested = []
+
+    def item_factory(start, stop):
+        requested.append((start, stop))
+        return [ipyvue.Html(tag="div", children=[str(i)]) for i in range(start, stop)]
+
+    scroll = ipyvue.VirtualScroll(
+        length=1000, item_factory=item_factory, evict_distance=100
+    )
+    scroll._handle_event(None, {"request_range": [0, 20]}, [])
+    scroll._handle_event(None, {"request_range": [10, 30]}, [])
+    assert requested == [(0, 20), (20, 30)]
+    first = scroll._lazy_children["0"]
+    assert first.children == ["0"]
+
+    scroll._handle_event(None, {"request_range": [500, 520]}, [])
+    assert sorted(map(int, scroll._lazy_children)) == list(range(500, 520))
+    assert first.comm is None
+
+    scroll.length = 510
+    assert len(scroll._lazy_children) == 10
+
+
+def test_compact_state(comm_messages, monkeypatch):
+    opened = comm_messages.opened
+    monkeypatch.setattr(ipyvue, "compact_state", True)
+    widgets = [ipyvue.Html(tag="div", class_="a") for _ in range(3)]
+
+    defaults = widgets[0]._defaults
+    assert widgets[1]._defaults is defaults
+    assert defaults.values["v_model"] == "!!disabled!!"
+    [defaults_state] = [s for s in opened if s["_model_name"] == "ClassDefaultsModel"]
+    assert defaults_state["values"] == defaults.values
+
+    state = opened[-1]
+    assert state["_model_name"] == "HtmlModel"
+    assert state["tag"] == "div" and state["class_"] == "a"
+    for name in ["v_model", "style_", "slot", "_events", "children"]:
+        assert name not in state
+    # widget references are always sent
+    assert state["_jupyter_vue"].startswith("IPY_MODEL_")
+
+
+def test_element_children(comm_messages):
+    opened = comm_messages.opened
+    button = ipyvue.Html(tag="button", children=["ok"])
+    opened.clear()
+
+    rows = [
+        ipyvue.Element("tr", [ipyvue.Element("td", [str(i)], class_="cell")])
+        for i in range(100)
+    ]
+    table = ipyvue.Html(
+        tag="table", children=rows + [ipyvue.Element("tfoot", [button])]
+    )
+
+    # only the parent widget is opened
+    [state] = opened
+    assert len(state["children"]) == 101
+    assert state["children"][0] == {
+        "element": {
+            "tag": "tr",
+            "children": [
+                {"element": {"tag": "td", "children": ["0"], "class_": "cell"}}
+            ],
+        }
+    }
+    assert state["children"][-1]["element"]["children"] == [
+        f"IPY_MODEL_{button.model_id}"
+    ]
+    assert table.children[0].tag == "tr"
+
+
+def test_event_options():
+    widget = VueWidget()
+    widget.on_event("mousemove", lambda *args: None, fields=["clientX"])
+    widget.on_event("scroll.passive", lambda *args: None, policy="throttle", wait=50)
+    widget.on_event("click", lambda *args: None)
+    assert widget._event_options == {
+        "mousemove": {"fields": ["clientX"]},
+        "scroll.passive": {"policy": "throttle", "wait": 50},
+    }
+
+    # registering again replaces the options
+    widget.on_event("mousemove.stop", lambda *args: None)
+    widget.on_event("scroll", None, remove=True)
+    assert widget._events == ["click", "mousemove.stop"]
+    assert widget._event_options == {}
+
+
+def test_async_event_handler():
+    widget = VueWidget()
+    handled = []
+
+    async def search(widget, event, data):
+        await asyncio.sleep(0.01)
+        handled.append(data)
+
+    # without a running loop, the handler runs to completion
+    widget.on_event("input", search)
+    widget.fire_event("input", "a")
+    assert handled == ["a"]
+
+    async def typing():
+        widget.on_event("input", search, cancel_running=True)
+        for text in ["ab", "abc", "abcd"]:
+            widget._handle_event(None, {"event": "input", "data": text}, [])
+            await asyncio.sleep(0)
+        # the handler doesn't block
+        assert handled == ["a"]
+        await asyncio.wait(list(widget._handler_tasks["input"]))
+
+    asyncio.run(typing())
+    assert handled == ["a", "abcd"]